@@ -20,9 +20,19 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 from src.user.models import *
 from src.task.models import *
+from src.job.models import *
 
 target_metadata = Base.metadata
 
+
+def include_name(name, type_, parent_names):
+    """Leave the tasks_fts search index and its shadow tables out of autogenerate,
+    they are managed by raw SQL in the migrations."""
+    if type_ == "table":
+        return not name.startswith("tasks_fts")
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -46,6 +56,7 @@ def run_migrations_offline() -> None:
         url=url,
         target_metadata=target_metadata,
         literal_binds=True,
+        include_name=include_name,
         dialect_opts={"paramstyle": "named"},
     )
 
@@ -67,7 +78,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
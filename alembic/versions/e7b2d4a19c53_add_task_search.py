@@ -0,0 +1,49 @@
+"""Add task search
+
+Revision ID: e7b2d4a19c53
+Revises: c41e7a9d2f08
+Create Date: 2026-10-18 12:26:05.781342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b2d4a19c53'
+down_revision = 'c41e7a9d2f08'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # FTS5 index of the task titles, kept in sync with the tasks table by triggers
+    op.execute(
+        "CREATE VIRTUAL TABLE tasks_fts "
+        "USING fts5(title, content='tasks', content_rowid='id')"
+    )
+    op.execute(
+        "CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN "
+        "INSERT INTO tasks_fts (rowid, title) VALUES (new.id, new.title); END"
+    )
+    op.execute(
+        "CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN "
+        "INSERT INTO tasks_fts (tasks_fts, rowid, title) "
+        "VALUES ('delete', old.id, old.title); END"
+    )
+    op.execute(
+        "CREATE TRIGGER tasks_fts_update AFTER UPDATE OF title ON tasks "
+        "BEGIN INSERT INTO tasks_fts (tasks_fts, rowid, title) "
+        "VALUES ('delete', old.id, old.title); "
+        "INSERT INTO tasks_fts (rowid, title) VALUES (new.id, new.title); END"
+    )
+
+    # Index the tasks that already exist
+    op.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER tasks_fts_update")
+    op.execute("DROP TRIGGER tasks_fts_delete")
+    op.execute("DROP TRIGGER tasks_fts_insert")
+    op.execute("DROP TABLE tasks_fts")
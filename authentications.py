@@ -1,7 +1,36 @@
-from passlib.context import CryptContext
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from config import settings
 
-# Create a CryptContext object with bcrypt as the hashing scheme
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# CryptContext with bcrypt as the hashing scheme, created on first use
+_pwd_context = None
+
+# Process pool running the bcrypt calls, created on first use
+_hash_executor = None
+
+
+def get_pwd_context():
+    """Get the CryptContext used to hash and verify passwords.
+
+    passlib and its bcrypt backend are only imported when a password is first
+    hashed or verified, which keeps them out of the application startup.
+
+    Returns:
+        CryptContext: The shared crypt context.
+    """
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
 
 
 def verify_password(plain_password, hashed_password):
@@ -15,7 +44,7 @@ def verify_password(plain_password, hashed_password):
         bool: True if the plain password matches the hashed password, False otherwise.
     """
     # Verify if the plain password matches the hashed password
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password):
@@ -28,4 +57,128 @@ def get_password_hash(password):
         str: Hashed password.
     """
     # Hash the password using the CryptContext object
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+
+def get_hash_executor():
+    """Get the process pool used for password hashing.
+
+    bcrypt is pure CPU work that holds the GIL, so it runs in separate processes,
+    one per core by default (`HASH_WORKERS`). The pool is created inside a running,
+    threaded server, so its processes are started from a fork server (or spawned
+    where there is none) rather than forked from the server process, which could
+    copy a lock held by another thread and deadlock.
+
+    Returns:
+        ProcessPoolExecutor: The shared process pool.
+    """
+    global _hash_executor
+    if _hash_executor is None:
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("forkserver")
+            # Workers are forked from a server that already imported this module
+            context.set_forkserver_preload([__name__])
+        else:
+            context = multiprocessing.get_context("spawn")
+        _hash_executor = ProcessPoolExecutor(
+            max_workers=settings.HASH_WORKERS, mp_context=context
+        )
+    return _hash_executor
+
+
+def shutdown_hash_executor():
+    """Stop the password hashing processes, if they were started."""
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(cancel_futures=True)
+        _hash_executor = None
+
+
+async def verify_password_async(plain_password, hashed_password):
+    """Verify a password in the hashing process pool, without blocking the event loop.
+
+    Args:
+        plain_password (str): Plain password to verify.
+        hashed_password (str): Hashed password to compare against.
+
+    Returns:
+        bool: True if the plain password matches the hashed password, False otherwise.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_hash_executor(), verify_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password):
+    """Hash a password in the hashing process pool, without blocking the event loop.
+
+    Args:
+        password (str): Password to hash.
+
+    Returns:
+        str: Hashed password.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_hash_executor(), get_password_hash, password)
+
+
+def _b64encode(data: bytes):
+    """Encode bytes as unpadded URL safe base64."""
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _sign(payload: bytes):
+    """Get the encoded HMAC-SHA256 signature of a token payload."""
+    key = settings.SECRET_KEY.encode()
+    return _b64encode(hmac.new(key, payload, hashlib.sha256).digest())
+
+
+def create_access_token(user_id: int, expires_in: Optional[float] = None):
+    """Issue a signed access token for a user.
+
+    The token is `<payload>.<signature>`: the base64 encoded JSON payload holds the
+    user id and the expiry time, the signature is an HMAC of the payload with
+    `SECRET_KEY`. Checking it needs neither bcrypt nor the database.
+
+    Args:
+        user_id (int): ID of the authenticated user.
+        expires_in (float, optional): Seconds the token stays valid. Defaults to
+            `ACCESS_TOKEN_EXPIRE_MINUTES`.
+
+    Returns:
+        str: The access token.
+    """
+    if expires_in is None:
+        expires_in = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    expires_at = int(time.time() + expires_in)
+
+    payload = _b64encode(
+        json.dumps({"sub": user_id, "exp": expires_at}, separators=(",", ":")).encode()
+    )
+    return (payload + b"." + _sign(payload)).decode()
+
+
+def decode_access_token(token: str):
+    """Check the signature and expiry of an access token.
+
+    Args:
+        token (str): Token issued by `create_access_token`.
+
+    Returns:
+        int: ID of the user the token was issued for, or None if the token is
+            malformed, forged or expired.
+    """
+    try:
+        payload, _, signature = token.encode("ascii").partition(b".")
+    except UnicodeEncodeError:
+        return None
+
+    # Constant time comparison, the payload is only parsed once it is trusted
+    if not hmac.compare_digest(signature, _sign(payload)):
+        return None
+
+    claims = json.loads(base64.urlsafe_b64decode(payload + b"=" * (-len(payload) % 4)))
+    if claims["exp"] <= time.time():
+        return None
+    return claims["sub"]
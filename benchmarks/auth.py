@@ -0,0 +1,57 @@
+"""Compare the cost of checking an access token with verifying a password.
+
+The token check is the `get_current_user` dependency with the user already in
+the principal cache, as on every request after the login. The password check is
+the bcrypt verify that sending credentials with each request would cost. Run
+from the repository root:
+
+    python -m benchmarks.auth --requests 100000
+"""
+import argparse
+import asyncio
+import os
+import time
+
+
+async def check_tokens(credentials, requests: int):
+    """Authenticate `requests` requests and return the wall time in seconds."""
+    from src.auth.services import get_current_user
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await get_current_user(credentials)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100000)
+    parser.add_argument("--passwords", type=int, default=10)
+    args = parser.parse_args()
+
+    # Settings are read on import, the tokens need a signing key
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+
+    from fastapi.security import HTTPAuthorizationCredentials
+    from authentications import create_access_token, get_password_hash, verify_password
+    from src.user.models import User
+    from src.user.services import principal_cache
+
+    hashed_password = get_password_hash("password")
+    principal_cache.set(1, User(id=1, username="user", password=hashed_password))
+    credentials = HTTPAuthorizationCredentials(
+        scheme="Bearer", credentials=create_access_token(1)
+    )
+
+    token = asyncio.run(check_tokens(credentials, args.requests)) / args.requests
+    start = time.perf_counter()
+    for _ in range(args.passwords):
+        verify_password("password", hashed_password)
+    password = (time.perf_counter() - start) / args.passwords
+
+    print(f"token check:     {token * 1_000_000:>10.2f} us")
+    print(f"password verify: {password * 1_000_000:>10.2f} us")
+
+
+if __name__ == "__main__":
+    main()
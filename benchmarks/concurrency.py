@@ -0,0 +1,163 @@
+"""Measure read throughput while writers commit, before and after the engine split.
+
+Readers page through the tasks like GET /tasks while writers insert tasks, one
+commit each. The `default` setup is a single engine with the default pool and
+the rollback journal, `tuned` is the WAL mode write and read engines of
+`database`. Run from the repository root:
+
+    python -m benchmarks.concurrency --tasks 100000 --readers 8 --writers 2
+"""
+import argparse
+import logging
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import create_engine, insert, select
+import config
+import database
+from database import Base
+from src.user.models import User  # noqa: F401, registers the users table
+from src.task.models import Task
+
+# Rows are inserted in chunks of this size when seeding
+SEED_CHUNK_SIZE = 50_000
+
+
+def seed(url: str, tasks: int):
+    """Create the schema in a new database file and insert `tasks` tasks."""
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        for offset in range(0, tasks, SEED_CHUNK_SIZE):
+            connection.execute(
+                insert(Task.__table__),
+                [
+                    dict(
+                        title=f"task {offset + i}",
+                        category="research",
+                        created_at=now,
+                        updated_at=now,
+                    )
+                    for i in range(min(SEED_CHUNK_SIZE, tasks - offset))
+                ],
+            )
+    engine.dispose()
+
+
+def build_engines(setup: str, url: str):
+    """Get the (write, read) engines of a setup."""
+    if setup == "default":
+        engine = create_engine(url)
+        return engine, engine
+
+    settings = config.Settings()
+    settings.DATABASE_URL = url
+    database.configure(settings)
+    return database.get_engine(), database.get_read_engine()
+
+
+def run(setup: str, url: str, args):
+    """Run the readers and writers for `args.duration` seconds, get their stats."""
+    write_engine, read_engine = build_engines(setup, url)
+    stop = threading.Event()
+    read_latencies, writes, errors = [], [0], [0]
+    lock = threading.Lock()
+
+    def reader(seed: int):
+        rng = random.Random(seed)
+        latencies = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                with read_engine.connect() as connection:
+                    connection.execute(
+                        select(*Task.__table__.c)
+                        .where(Task.id > rng.randrange(args.tasks))
+                        .order_by(Task.id)
+                        .limit(50)
+                    ).all()
+            except Exception:
+                with lock:
+                    errors[0] += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+        with lock:
+            read_latencies.extend(latencies)
+
+    def writer():
+        now = datetime.utcnow()
+        while not stop.is_set():
+            try:
+                with write_engine.begin() as connection:
+                    connection.execute(
+                        insert(Task.__table__).values(
+                            title="write",
+                            category="research",
+                            created_at=now,
+                            updated_at=now,
+                        )
+                    )
+            except Exception:
+                with lock:
+                    errors[0] += 1
+                continue
+            with lock:
+                writes[0] += 1
+
+    threads = [
+        threading.Thread(target=reader, args=(i,)) for i in range(args.readers)
+    ] + [threading.Thread(target=writer) for _ in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    write_engine.dispose()
+    read_engine.dispose()
+
+    read_latencies.sort()
+    return dict(
+        reads=len(read_latencies) / args.duration,
+        p50=statistics.median(read_latencies) if read_latencies else 0.0,
+        p99=(
+            read_latencies[int(len(read_latencies) * 0.99)] if read_latencies else 0.0
+        ),
+        writes=writes[0] / args.duration,
+        errors=errors[0],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+    # Reads queued behind the writers would flood the output with slow query logs
+    logging.getLogger("query_stats").setLevel(logging.ERROR)
+
+    print(
+        f"{'setup':<8} {'reads/s':>9} {'p50 (ms)':>9} {'p99 (ms)':>9} "
+        f"{'writes/s':>9} {'errors':>7}"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for setup in ("default", "tuned"):
+            # A fresh file per setup, WAL mode is persisted in the database file
+            url = f"sqlite:///{os.path.join(directory, setup + '.db')}"
+            seed(url, args.tasks)
+            stats = run(setup, url, args)
+            print(
+                f"{setup:<8} {stats['reads']:>9.0f} {stats['p50']:>9.2f} "
+                f"{stats['p99']:>9.2f} {stats['writes']:>9.0f} {stats['errors']:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""Load test the API in-process and compare the results with a baseline.
+
+Seeds a throwaway SQLite database, drives `main.app` through an ASGI client at
+fixed concurrency levels and reports throughput and p50/p99 latency per endpoint.
+Run from the repository root:
+
+    python -m benchmarks.load --users 10000 --tasks 100000 --output results.json
+    python -m benchmarks.load --baseline results.json
+
+The exit code is 1 when an endpoint is slower than the baseline by more than the
+tolerance.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Rows are inserted in chunks of this size when seeding
+SEED_CHUNK_SIZE = 50_000
+
+# Endpoints left out unless asked for, they stream the whole table, spend most of
+# their time hashing passwords or delete the seeded tasks
+HEAVY_ENDPOINTS = (
+    "users.export",
+    "tasks.export",
+    "users.create",
+    "users.bulk",
+    "auth.login",
+    "tasks.delete",
+)
+
+
+def configure_database(directory: str):
+    """Point the application at a fresh database file, before it is imported.
+
+    A fixed `SECRET_KEY` is used unless one is set, the application requires it.
+    """
+    path = os.path.join(directory, "benchmark.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ["ASYNC_DATABASE_URL"] = f"sqlite+aiosqlite:///{path}"
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+
+
+def seed(users: int, tasks: int, rng: random.Random):
+    """Create the schema and insert `users` users and `tasks` tasks."""
+    from sqlalchemy import insert
+    from authentications import get_password_hash
+    from database import Base, engine
+    from src.user.models import User
+    from src.task.models import Task, TaskCategory
+    from src.task.services import rebuild_task_stats
+
+    Base.metadata.create_all(engine)
+    categories = [category.value for category in TaskCategory]
+    # bcrypt is slow on purpose, every user shares one hash
+    password = get_password_hash("benchmark")
+    start = datetime.utcnow() - timedelta(days=365)
+
+    with engine.begin() as connection:
+        for offset in range(0, users, SEED_CHUNK_SIZE):
+            connection.execute(
+                insert(User.__table__),
+                [
+                    dict(
+                        username=f"user{i}",
+                        email=f"user{i}@example.com",
+                        phn_no=9000000000 + i,
+                        password=password,
+                        is_active=True,
+                        created_at=start,
+                        updated_at=start,
+                    )
+                    for i in range(offset, min(offset + SEED_CHUNK_SIZE, users))
+                ],
+            )
+
+        for offset in range(0, tasks, SEED_CHUNK_SIZE):
+            rows = []
+            for i in range(offset, min(offset + SEED_CHUNK_SIZE, tasks)):
+                created_at = start + timedelta(seconds=rng.randrange(365 * 86400))
+                rows.append(
+                    dict(
+                        title=f"Task {i}",
+                        category=rng.choice(categories),
+                        assign_to=rng.randint(1, users),
+                        created_at=created_at,
+                        updated_at=created_at,
+                    )
+                )
+            connection.execute(insert(Task.__table__), rows)
+
+        rebuild_task_stats(connection)
+
+
+def auth_headers():
+    """Headers authenticating the requests as the first seeded user."""
+    from authentications import create_access_token
+
+    return {"Authorization": f"Bearer {create_access_token(1)}"}
+
+
+def build_endpoints(users: int, tasks: int, rng: random.Random):
+    """Map endpoint names to functions building the arguments of one request."""
+    counter = iter(range(sys.maxsize))
+
+    def new_user():
+        n = next(counter)
+        return dict(
+            username=f"bench{n}",
+            email=f"bench{n}@example.com",
+            phn_no=8000000000 + n,
+            password="benchmark",
+            confirm_password="benchmark",
+        )
+
+    def new_task():
+        return dict(
+            title="Benchmark task", category="research", assign_to=rng.randint(1, users)
+        )
+
+    return {
+        "users.list": lambda: ("GET", "/users", None),
+        "users.get": lambda: ("GET", f"/users/{rng.randint(1, users)}", None),
+        "users.create": lambda: ("POST", "/users", new_user()),
+        "users.bulk": lambda: ("POST", "/users/bulk", [new_user() for _ in range(10)]),
+        "users.update": lambda: (
+            "PATCH",
+            f"/users/{rng.randint(1, users)}",
+            {"phn_no": rng.randint(7000000000, 7999999999)},
+        ),
+        "users.export": lambda: ("GET", "/users/export", None),
+        "users.me": lambda: ("GET", "/users/me", None),
+        "auth.login": lambda: (
+            "POST",
+            "/auth/login",
+            {"username": f"user{rng.randrange(users)}", "password": "benchmark"},
+        ),
+        "tasks.list": lambda: ("GET", "/tasks", None),
+        "tasks.filter": lambda: (
+            "GET",
+            f"/tasks?assign_to={rng.randint(1, users)}&sort=-created_at",
+            None,
+        ),
+        "tasks.get": lambda: ("GET", f"/tasks/{rng.randint(1, tasks)}", None),
+        "tasks.search": lambda: (
+            "GET",
+            f"/tasks/search?q=task+{rng.randrange(tasks)}",
+            None,
+        ),
+        "tasks.stats": lambda: (
+            "GET",
+            f"/tasks/stats?user_id={rng.randint(1, users)}",
+            None,
+        ),
+        "tasks.create": lambda: ("POST", "/tasks", new_task()),
+        "tasks.bulk": lambda: ("POST", "/tasks/bulk", [new_task() for _ in range(100)]),
+        "tasks.update": lambda: (
+            "PATCH",
+            f"/tasks/{rng.randint(1, tasks)}",
+            {"title": "Updated task"},
+        ),
+        "tasks.reassign": lambda: (
+            "POST",
+            "/tasks/reassign",
+            {
+                "ids": rng.sample(range(1, tasks + 1), min(tasks, 10)),
+                "assign_to": rng.randint(1, users),
+            },
+        ),
+        "tasks.delete": lambda: (
+            "DELETE",
+            f"/tasks?assign_to={rng.randint(1, users)}",
+            None,
+        ),
+        "tasks.export": lambda: ("GET", "/tasks/export", None),
+    }
+
+
+def percentile(values: list, q: float):
+    """Nearest rank percentile of sorted values."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def run_level(client, make_request, requests: int, concurrency: int):
+    """Send `requests` requests with `concurrency` clients and summarize them."""
+    latencies = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal errors, remaining
+        while remaining > 0:
+            remaining -= 1
+            method, url, payload = make_request()
+            start = time.perf_counter()
+            response = await client.request(method, url, json=payload)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput": round(requests / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+async def run(endpoints: dict, names: list, requests: int, levels: list):
+    """Benchmark every selected endpoint at every concurrency level."""
+    import httpx
+    from main import app
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", headers=auth_headers()
+    ) as client:
+        for name in names:
+            results[name] = {}
+            for concurrency in levels:
+                summary = await run_level(
+                    client, endpoints[name], requests, concurrency
+                )
+                results[name][str(concurrency)] = summary
+                print(
+                    f"{name:<14} {concurrency:>5} {summary['throughput']:>10.1f} "
+                    f"{summary['p50_ms']:>9.2f} {summary['p99_ms']:>9.2f} "
+                    f"{summary['errors']:>6}"
+                )
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float):
+    """List the measurements that regressed compared to the baseline.
+
+    Args:
+        results (dict): Results of this run.
+        baseline (dict): Results of the reference run.
+        tolerance (float): Allowed relative slowdown, e.g. 0.1 for 10%.
+
+    Returns:
+        list: Human readable description of each regression.
+    """
+    regressions = []
+    for name, levels in results.items():
+        for concurrency, current in levels.items():
+            reference = baseline.get(name, {}).get(concurrency)
+            if reference is None:
+                continue
+
+            if current["throughput"] < reference["throughput"] * (1 - tolerance):
+                regressions.append(
+                    f"{name} x{concurrency}: throughput {current['throughput']} "
+                    f"< {reference['throughput']}"
+                )
+            if current["p99_ms"] > reference["p99_ms"] * (1 + tolerance):
+                regressions.append(
+                    f"{name} x{concurrency}: p99 {current['p99_ms']} ms "
+                    f"> {reference['p99_ms']} ms"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=500, help="per level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--endpoints", nargs="+", help="defaults to all but heavy ones")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    # Slow query and N+1 warnings would flood the output under load
+    logging.getLogger("query_stats").setLevel(logging.ERROR)
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        configure_database(directory)
+
+        start = time.perf_counter()
+        seed(args.users, args.tasks, rng)
+        print(
+            f"seeded {args.users} users and {args.tasks} tasks "
+            f"in {time.perf_counter() - start:.1f} s"
+        )
+
+        endpoints = build_endpoints(args.users, args.tasks, rng)
+        names = args.endpoints or [
+            name for name in endpoints if name not in HEAVY_ENDPOINTS
+        ]
+        unknown = set(names) - set(endpoints)
+        if unknown:
+            parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+
+        print(
+            f"{'endpoint':<14} {'conc':>5} {'req/s':>10} {'p50 (ms)':>9} "
+            f"{'p99 (ms)':>9} {'errors':>6}"
+        )
+        results = asyncio.run(run(endpoints, names, args.requests, args.concurrency))
+
+    report = {
+        "meta": {
+            "users": args.users,
+            "tasks": args.tasks,
+            "requests": args.requests,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "date": datetime.utcnow().isoformat(),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Measure the per request overhead of MetricsMiddleware.
+
+Runs a minimal ASGI app with and without the middleware and reports the
+difference per request. Run from the repository root:
+
+    python -m benchmarks.metrics_overhead --requests 100000
+"""
+import argparse
+import asyncio
+import time
+from metrics import MetricsMiddleware, MetricsRegistry
+
+
+async def endpoint(scope, receive, send):
+    """Smallest possible ASGI app answering 200 with a short body."""
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+async def run(app, requests: int):
+    """Serve `requests` requests and return the wall time in seconds."""
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/tasks",
+        "headers": [(b"host", b"testserver"), (b"content-length", b"0")],
+    }
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100000)
+    args = parser.parse_args()
+
+    bare = asyncio.run(run(endpoint, args.requests))
+    wrapped = asyncio.run(
+        run(MetricsMiddleware(endpoint, MetricsRegistry()), args.requests)
+    )
+    overhead = (wrapped - bare) / args.requests * 1_000_000
+    print(f"overhead per request: {overhead:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
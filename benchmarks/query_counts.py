@@ -0,0 +1,130 @@
+"""Check the number of SQL statements and commits of each endpoint against a budget.
+
+Seeds a small throwaway database, sends one request per endpoint with the lookup
+caches disabled and counts what reaches the database. Exports are left out, they
+stream their rows after the response has started. Run from the repository
+root:
+
+    python -m benchmarks.query_counts
+
+The exit code is 1 when an endpoint goes over its budget, so N+1 queries and
+extra transactions are caught before they reach the load test. It is also 1 when
+an endpoint of `benchmarks.load` has no budget, or when one of the invalid
+requests is not rejected or commits anything. Run it before merging a change to
+a handler or a service.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+# Endpoint name: (statements, commits) allowed for one request
+BUDGETS = {
+    "users.list": (2, 0),
+    "users.get": (1, 0),
+    "users.create": (1, 1),
+    "users.bulk": (3, 1),
+    "users.update": (1, 1),
+    "users.me": (1, 0),
+    "auth.login": (1, 0),
+    "tasks.list": (2, 0),
+    "tasks.filter": (2, 0),
+    "tasks.get": (1, 0),
+    "tasks.stats": (1, 0),
+    "tasks.create": (3, 1),
+    "tasks.bulk": (3, 1),
+    "tasks.update": (1, 1),
+    "tasks.search": (1, 0),
+    "tasks.reassign": (6, 1),
+    # Last, it deletes seeded tasks the other requests may look up
+    "tasks.delete": (3, 1),
+}
+
+# Endpoints without a budget, they stream their rows after the response started
+UNBUDGETED = ("users.export", "tasks.export")
+
+# Case name: (method, url, payload, status) of requests that must be rejected
+# before they write anything
+REJECTED = {
+    "null category": ("POST", "/tasks/reassign", {"ids": [1], "category": None}, 422),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        from benchmarks.load import (
+            auth_headers,
+            build_endpoints,
+            configure_database,
+            seed,
+        )
+
+        # Settings are read on import: count statements per response, no caching
+        configure_database(directory)
+        os.environ["DEBUG"] = "true"
+        os.environ["CACHE_MAXSIZE"] = "0"
+        os.environ["PRINCIPAL_CACHE_SIZE"] = "0"
+
+        from fastapi.testclient import TestClient
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+        import main as application
+
+        app = application.create_app()
+        rng = random.Random(args.seed)
+        seed(args.users, args.tasks, rng)
+        endpoints = build_endpoints(args.users, args.tasks, rng)
+
+        # Requests are sent one at a time, so a global counter is enough
+        commits = [0]
+        event.listen(
+            Engine, "commit", lambda connection: commits.__setitem__(0, commits[0] + 1)
+        )
+
+        print(f"{'endpoint':<14} {'statements':>10} {'commits':>8} {'budget':>8}")
+        # A new benchmark endpoint must get a budget
+        missing = sorted(set(endpoints) - set(BUDGETS) - set(UNBUDGETED))
+        for name in missing:
+            print(f"{name:<14} NO BUDGET")
+        failures = len(missing)
+        with TestClient(app, headers=auth_headers()) as client:
+            for name, (max_statements, max_commits) in BUDGETS.items():
+                method, url, payload = endpoints[name]()
+                commits[0] = 0
+                response = client.request(method, url, json=payload)
+                statements = int(response.headers["x-db-queries"])
+                over = (
+                    response.status_code >= 400
+                    or statements > max_statements
+                    or commits[0] > max_commits
+                )
+                failures += over
+                print(
+                    f"{name:<14} {statements:>10} {commits[0]:>8} "
+                    f"{f'{max_statements}/{max_commits}':>8}"
+                    f"{f'  OVER BUDGET ({response.status_code})' if over else ''}"
+                )
+
+            for name, (method, url, payload, status) in REJECTED.items():
+                commits[0] = 0
+                response = client.request(method, url, json=payload)
+                accepted = response.status_code != status or commits[0] > 0
+                failures += accepted
+                print(
+                    f"{name:<14} {response.status_code:>10} {commits[0]:>8} "
+                    f"{status:>8}{'  NOT REJECTED' if accepted else ''}"
+                )
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
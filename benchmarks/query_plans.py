@@ -0,0 +1,128 @@
+"""Check that the task list queries are served by the expected indexes.
+
+Seeds a small throwaway database, builds the GET /tasks statement of each filter
+and sort combination the way the handler does and runs EXPLAIN QUERY PLAN on it.
+Run from the repository root:
+
+    python -m benchmarks.query_plans
+
+The exit code is 1 when a query does not search the expected index, or sorts its
+rows in a temporary B-tree where the index should give them in order, so an index
+cannot be dropped while a query needs it.
+"""
+import argparse
+import logging
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Name: (GET /tasks query parameters, sort, index the plan must search, whether
+# the index gives the rows in order). Sorting by id within one user sorts only the
+# tasks of that user, there is no (assign_to, id) index for it.
+CASES = {
+    "assign_to": (dict(assign_to=1), "id", "ix_tasks_assign_to_", False),
+    "assign_to+category": (
+        dict(assign_to=1, category="research"),
+        "id",
+        "ix_tasks_assign_to_category_created_at",
+        False,
+    ),
+    "assign_to+category+created": (
+        dict(assign_to=1, category="research", created_after=30),
+        "created_at",
+        "ix_tasks_assign_to_category_created_at",
+        True,
+    ),
+    "assign_to+updated": (
+        dict(assign_to=1, updated_after=30),
+        "updated_at",
+        "ix_tasks_assign_to_updated_at",
+        True,
+    ),
+    "category+created": (
+        dict(category="research", created_after=30),
+        "-created_at",
+        "ix_tasks_category_created_at",
+        True,
+    ),
+    "created": (dict(created_after=30), "created_at", "ix_tasks_created_at", True),
+    "sort_created": ({}, "-created_at", "ix_tasks_created_at", True),
+    "updated": (dict(updated_before=30), "-updated_at", "ix_tasks_updated_at", True),
+    "sort_updated": ({}, "updated_at", "ix_tasks_updated_at", True),
+}
+
+
+def explain(connection, statement):
+    """Get the detail lines of the query plan of a statement."""
+    compiled = statement.compile(
+        dialect=connection.dialect, compile_kwargs={"literal_binds": True}
+    )
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").all()
+    return [row[-1] for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        from benchmarks.load import configure_database, seed
+
+        configure_database(directory)
+        # Seeding would flood the output with slow query logs
+        logging.getLogger("query_stats").setLevel(logging.ERROR)
+
+        from sqlalchemy import select
+        import main as application
+        from database import engine
+        from pagination import keyset
+        from src.task.models import Task, TaskCategory
+        from src.task.schemas import TaskSort
+        from src.task.services import get_task_filters
+
+        application.create_app()
+        seed(args.users, args.tasks, random.Random(args.seed))
+        now = datetime.utcnow()
+
+        failures = 0
+        with engine.connect() as connection:
+            for name, (params, sort, index, ordered) in CASES.items():
+                # Time range parameters are given in days before now
+                params = {
+                    key: (
+                        now - timedelta(days=value)
+                        if key.endswith(("_after", "_before"))
+                        else TaskCategory(value)
+                        if key == "category"
+                        else value
+                    )
+                    for key, value in params.items()
+                }
+                sort = TaskSort(sort)
+                statement = keyset(
+                    select(*Task.__table__.c).where(*get_task_filters(**params)),
+                    Task.id,
+                    limit=50,
+                    sort_column=getattr(Task, sort.field),
+                    descending=sort.descending,
+                )
+                plan = explain(connection, statement)
+                sorted_in_memory = any("TEMP B-TREE" in line for line in plan)
+                ok = any(f"INDEX {index}" in line for line in plan) and not (
+                    ordered and sorted_in_memory
+                )
+                failures += not ok
+                print(f"{name:<28} {'ok' if ok else 'UNEXPECTED PLAN'}")
+                for line in plan:
+                    print(f"    {line}")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
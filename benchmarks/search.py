@@ -0,0 +1,110 @@
+"""Compare the FTS5 task search with a LIKE '%word%' scan of the titles.
+
+LIKE stops at the first `limit` matches in id order, so it is fast for frequent
+words and scans the whole table for rare ones. The ranked search reads the index
+entries of the word only, but scores every match before sorting by rank.
+
+Run from the repository root:
+
+    python -m benchmarks.search --rows 10000 100000 1000000
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime
+from sqlalchemy import create_engine, func, insert, select
+from database import Base
+from src.user.models import User  # noqa: F401, registers the users table
+from src.task.models import Task
+from src.task.search import search_tasks_query
+
+# Number of distinct words in the titles, their frequencies follow Zipf's law
+VOCABULARY_SIZE = 5000
+VOCABULARY = [f"word{rank}" for rank in range(VOCABULARY_SIZE)]
+
+
+def seed(rows: int, rng: random.Random):
+    """Create an in-memory database holding `rows` tasks with random titles."""
+    engine = create_engine("sqlite://")
+    # The search index and its triggers are created with the tasks table
+    Base.metadata.create_all(engine)
+    weights = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        for offset in range(0, rows, 50_000):
+            connection.execute(
+                insert(Task.__table__),
+                [
+                    dict(
+                        title=" ".join(rng.choices(VOCABULARY, weights, k=4)),
+                        category="research",
+                        created_at=now,
+                        updated_at=now,
+                    )
+                    for _ in range(min(50_000, rows - offset))
+                ],
+            )
+    return engine
+
+
+def like_statement(word: str, limit: int):
+    """Baseline: substring match on the B-tree indexed title column."""
+    return (
+        select(*Task.__table__.c)
+        .where(Task.title.like(f"%{word}%"))
+        .order_by(Task.id)
+        .limit(limit)
+    )
+
+
+def search_statement(word: str, limit: int):
+    """Full text search, best ranked first, as served by GET /tasks/search."""
+    matches = search_tasks_query(word)
+    return select(matches).order_by(matches.c.rank, matches.c.id).limit(limit)
+
+
+def count_matches(engine, word: str):
+    """Number of tasks whose title holds the word."""
+    matches = search_tasks_query(word)
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(matches)).scalar()
+
+
+def measure(engine, build, word: str, limit: int, repeat: int):
+    """Median wall time of one query, in milliseconds."""
+    timings = []
+    with engine.connect() as connection:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            connection.execute(build(word, limit)).all()
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # A frequent, a medium and a rare word, plus one that matches nothing
+    words = [VOCABULARY[0], VOCABULARY[50], VOCABULARY[-1], "missing"]
+    rng = random.Random(42)
+
+    print(
+        f"{'rows':>8} {'word':<10} {'matches':>8} {'like (ms)':>10} "
+        f"{'fts5 (ms)':>10}"
+    )
+    for rows in args.rows:
+        engine = seed(rows, rng)
+        for word in words:
+            matches = count_matches(engine, word)
+            like = measure(engine, like_statement, word, args.limit, args.repeat)
+            fts = measure(engine, search_statement, word, args.limit, args.repeat)
+            print(f"{rows:>8} {word:<10} {matches:>8} {like:>10.2f} {fts:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
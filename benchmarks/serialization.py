@@ -0,0 +1,85 @@
+"""Compare the ORM based and the column based serialization of task pages.
+
+Run from the repository root:
+
+    python -m benchmarks.serialization --rows 1000 10000 100000
+"""
+import argparse
+import json
+import time
+from datetime import datetime
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+from database import Base
+from src.user.models import User  # noqa: F401, registers the users table
+from src.task.models import Task
+from src.task.schemas import TaskResponseSchema, task_page_adapter
+from responses import page_response
+
+
+def seed(rows: int):
+    """Create an in-memory database holding `rows` tasks."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        connection.execute(
+            insert(Task.__table__),
+            [
+                dict(
+                    title=f"Task {i}",
+                    category="research",
+                    assign_to=None,
+                    created_at=now,
+                    updated_at=now,
+                )
+                for i in range(rows)
+            ],
+        )
+    return engine
+
+
+def orm_path(session: Session):
+    """Previous path: ORM objects, one model per row, then jsonable_encoder."""
+    tasks = session.query(Task).all()
+    items = [TaskResponseSchema(**(vars(task))) for task in tasks]
+    # FastAPI validates the return value against response_model and encodes it
+    validated = [TaskResponseSchema.model_validate(item) for item in items]
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def column_path(session: Session):
+    """New path: plain columns, one TypeAdapter call, pre-encoded JSON bytes."""
+    rows = session.execute(select(*Task.__table__.c)).all()
+    return page_response(task_page_adapter, rows, None, Response()).body
+
+
+def measure(function, session: Session, repeat: int):
+    """Best wall time of `repeat` runs, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        session.expunge_all()
+        start = time.perf_counter()
+        function(session)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'orm (ms)':>10} {'columns (ms)':>13} {'speedup':>8}")
+    for rows in args.rows:
+        with Session(seed(rows)) as session:
+            orm = measure(orm_path, session, args.repeat)
+            columns = measure(column_path, session, args.repeat)
+        print(f"{rows:>8} {orm:>10.1f} {columns:>13.1f} {orm / columns:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
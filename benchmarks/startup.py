@@ -0,0 +1,92 @@
+"""Measure the startup time of the application.
+
+Each run starts a fresh interpreter and reports the time to import `main`, to
+build the application with `create_app` and to serve the first request. Run
+from the repository root:
+
+    python -m benchmarks.startup --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Code run in the child interpreter, prints the timings in milliseconds as JSON
+CHILD = """
+import json, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+app = main.create_app()
+created = time.perf_counter()
+import httpx, asyncio
+
+async def first_request():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.get("/tasks")
+        response.raise_for_status()
+
+loop = asyncio.new_event_loop()
+request_start = time.perf_counter()
+loop.run_until_complete(first_request())
+served = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "create_app_ms": (created - imported) * 1000,
+    "first_request_ms": (served - request_start) * 1000,
+    "total_ms": (served - start) * 1000,
+}))
+"""
+
+
+def run_once(directory: str):
+    """Start one interpreter and return its timings."""
+    path = os.path.join(directory, "startup.db")
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{path}",
+        ASYNC_DATABASE_URL=f"sqlite+aiosqlite:///{path}",
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    # The child interpreters inherit it, the application requires one
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Create the schema once, the first request needs the tasks table
+        subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "from main import create_app; from database import Base, engine; "
+                "create_app(); Base.metadata.create_all(engine)",
+            ],
+            env=dict(os.environ, DATABASE_URL=f"sqlite:///{directory}/startup.db"),
+            check=True,
+        )
+        runs = [run_once(directory) for _ in range(args.runs)]
+
+    print(f"{'step':<18} {'median (ms)':>12} {'min (ms)':>10}")
+    for key in ("import_ms", "create_app_ms", "first_request_ms", "total_ms"):
+        values = [run[key] for run in runs]
+        print(f"{key:<18} {statistics.median(values):>12.1f} {min(values):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+# Key of the session.info entry holding the cache entries to drop after commit
+_PENDING_INVALIDATIONS = "cache_invalidations"
+
+
+class LRUTTLCache:
+    """
+    Bounded, thread safe cache whose entries expire after a time to live.
+
+    When the cache is full, the least recently used entry is evicted. Readers
+    take a `generation()` before loading a value from the database and pass it to
+    `set`, which drops the value if its key was invalidated in the meantime.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        # Incremented by every invalidation, the generation of the cache
+        self._generation = 0
+        # Generation at which each recently invalidated key was last invalidated,
+        # bounded like the entries. Keys dropped from it count as invalidated at
+        # `_forgotten_generation`, so a load older than that is not stored.
+        self._invalidated = OrderedDict()
+        self._forgotten_generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Get the value stored for a key, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def generation(self):
+        """Get the current generation, to pass to `set` with the value loaded next."""
+        with self._lock:
+            return self._generation
+
+    def set(self, key, value, generation: Optional[int] = None):
+        """Store a value, evicting the least recently used entries if needed.
+
+        Args:
+            key (Any): Key of the value.
+            value (Any): Value to store.
+            generation (int, optional): Generation taken before the value was
+                loaded. The value is dropped if the key was invalidated since.
+        """
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            if generation is not None:
+                invalidated = self._invalidated.get(key, self._forgotten_generation)
+                if invalidated > generation:
+                    return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        """Drop the entry of a key, if any, and the values of it being loaded."""
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._data.pop(key, None)
+            self._generation += 1
+            self._invalidated[key] = self._generation
+            self._invalidated.move_to_end(key)
+            while len(self._invalidated) > self.maxsize:
+                _, forgotten = self._invalidated.popitem(last=False)
+                self._forgotten_generation = forgotten
+
+    def clear(self):
+        """Drop every entry, and every value being loaded."""
+        with self._lock:
+            self._data.clear()
+            self._generation += 1
+            self._invalidated.clear()
+            self._forgotten_generation = self._generation
+
+    def stats(self):
+        """Get the cache counters.
+
+        Returns:
+            dict: Size, capacity and hit/miss/eviction counters of the cache.
+        """
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def _snapshot(instance):
+    """Copy the column values of a loaded instance into a plain dict."""
+    mapper = inspect(instance).mapper
+    return {attr.key: getattr(instance, attr.key) for attr in mapper.column_attrs}
+
+
+def _from_snapshot(model, values):
+    """Rebuild a detached instance from a snapshot, without touching the database."""
+    instance = model(**values)
+    make_transient_to_detached(instance)
+    return instance
+
+
+def get_cached(db: Session, model, cache: LRUTTLCache, ident):
+    """Get a row by primary key, going to the database only on a cache miss.
+
+    Args:
+        db (Session): Database session object.
+        model (Base): Mapped class of the row.
+        cache (LRUTTLCache): Cache holding snapshots of the rows of the model.
+        ident (Any): Primary key of the row.
+
+    Returns:
+        Base: Instance attached to the session, or None if the row does not exist.
+    """
+    values = cache.get(ident)
+    if values is not None:
+        # Attach a copy to the session without emitting a SELECT
+        return db.merge(_from_snapshot(model, values), load=False)
+
+    # Taken before the SELECT, a row invalidated meanwhile is not cached
+    generation = cache.generation()
+    instance = db.get(model, ident)
+    if instance is not None:
+        cache.set(ident, _snapshot(instance), generation)
+    return instance
+
+
+async def get_cached_async(db, model, cache: LRUTTLCache, ident):
+    """Async version of `get_cached`, for an AsyncSession.
+
+    Args:
+        db (AsyncSession): Async database session object.
+        model (Base): Mapped class of the row.
+        cache (LRUTTLCache): Cache holding snapshots of the rows of the model.
+        ident (Any): Primary key of the row.
+
+    Returns:
+        Base: Instance attached to the session, or None if the row does not exist.
+    """
+    values = cache.get(ident)
+    if values is not None:
+        return await db.merge(_from_snapshot(model, values), load=False)
+
+    generation = cache.generation()
+    instance = await db.get(model, ident)
+    if instance is not None:
+        cache.set(ident, _snapshot(instance), generation)
+    return instance
+
+
+def invalidate_on_write(model, cache: LRUTTLCache):
+    """Keep a cache consistent with the writes made to a model through the ORM.
+
+    Entries are dropped when the row is flushed and again once the transaction
+    commits. Each invalidation also discards the values of the key that were
+    being loaded, so a reader that read the old row before the commit cannot
+    store it afterwards (see `get_cached`). Bulk query updates and deletes clear
+    the whole cache.
+
+    Args:
+        model (Base): Mapped class whose rows are cached.
+        cache (LRUTTLCache): Cache holding snapshots of the rows of the model.
+    """
+
+    def on_write(mapper, connection, target):
+        session = Session.object_session(target)
+        if session is not None:
+            invalidate_after_commit(session, cache, target.id)
+        else:
+            cache.invalidate(target.id)
+
+    def on_bulk_write(context):
+        if context.mapper.class_ is model:
+            cache.clear()
+
+    event.listen(model, "after_update", on_write)
+    event.listen(model, "after_delete", on_write)
+    event.listen(Session, "after_bulk_update", on_bulk_write)
+    event.listen(Session, "after_bulk_delete", on_bulk_write)
+
+
+def invalidate_after_commit(session: Session, cache: LRUTTLCache, key):
+    """Drop a cache entry now and again once the session commits.
+
+    Used by the writes that bypass the ORM events, e.g. Core UPDATE statements.
+
+    Args:
+        session (Session): Session writing the row.
+        cache (LRUTTLCache): Cache holding the row.
+        key (Any): Primary key of the row.
+    """
+    cache.invalidate(key)
+    session.info.setdefault(_PENDING_INVALIDATIONS, set()).add((cache, key))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    for cache, key in session.info.pop(_PENDING_INVALIDATIONS, ()):
+        cache.invalidate(key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(_PENDING_INVALIDATIONS, None)
@@ -0,0 +1,182 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response
+from sqlalchemy import DDL, Column, DateTime, Integer, String, event, func, select
+from database import Base
+
+
+class CollectionVersion(Base):
+    """
+    Represents the change counter of a table, the version of its list endpoint.
+
+    Bumped by triggers in the transaction of every insert, update and delete, see
+    `track_collection`, so Core statements and other processes bump it too.
+    """
+
+    __tablename__ = "collection_versions"
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    # UTC time of the last change, with millisecond precision
+    updated_at = Column(DateTime)
+
+
+def collection_version_ddl(tablename: str):
+    """Build the statements creating the triggers that bump a table's version.
+
+    Args:
+        tablename (str): Name of the tracked table.
+
+    Returns:
+        tuple: One CREATE TRIGGER statement per kind of write.
+    """
+    bump = (
+        f"INSERT INTO collection_versions (name, version, updated_at) "
+        f"VALUES ('{tablename}', 1, strftime('%Y-%m-%d %H:%M:%f', 'now')) "
+        f"ON CONFLICT (name) DO UPDATE SET version = version + 1, "
+        f"updated_at = excluded.updated_at"
+    )
+    return tuple(
+        f"CREATE TRIGGER IF NOT EXISTS {tablename}_version_{operation.lower()} "
+        f"AFTER {operation} ON {tablename} BEGIN {bump}; END"
+        for operation in ("INSERT", "UPDATE", "DELETE")
+    )
+
+
+def track_collection(model):
+    """Create the version triggers of a model's table along with the table.
+
+    Only used when the schema is built with create_all, migrations create the
+    triggers explicitly.
+
+    Args:
+        model (Base): Mapped class of the collection.
+    """
+    for statement in collection_version_ddl(model.__tablename__):
+        # DDL formats the statement with %, the strftime format must be escaped
+        statement = statement.replace("%", "%%")
+        event.listen(
+            model.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+        )
+
+
+def make_etag(*parts):
+    """Build a weak ETag from the values that identify a representation.
+
+    Args:
+        *parts (Any): Values that change whenever the representation changes.
+
+    Returns:
+        str: Weak entity tag, quoted.
+    """
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def collection_state(model):
+    """Build the statement that reads the version of a collection.
+
+    A primary key lookup in `collection_versions`, its cost does not grow with the
+    table. The version changes on every write to the table, so filtered views are
+    invalidated by writes to rows they do not hold too.
+
+    Args:
+        model (Base): Mapped class of the collection, tracked by `track_collection`.
+
+    Returns:
+        Select: Statement returning one (version, updated_at) row, both None if the
+            table was never written to.
+    """
+    return select(
+        func.max(CollectionVersion.version), func.max(CollectionVersion.updated_at)
+    ).where(CollectionVersion.name == model.__tablename__)
+
+
+def collection_validators(state, *parts):
+    """Get the ETag and Last-Modified of a collection from its state.
+
+    Args:
+        state (Row): Row returned by the `collection_state` statement.
+        *parts (Any): Request values that select the representation (page, filters).
+
+    Returns:
+        tuple: ETag and last modification time of the collection.
+    """
+    version, last_modified = state
+    return make_etag(version, *parts), last_modified
+
+
+def item_validators(instance):
+    """Get the ETag and Last-Modified of a single row.
+
+    Args:
+        instance (Base): Row with `id` and `updated_at` columns.
+
+    Returns:
+        tuple: ETag and last modification time of the row.
+    """
+    return make_etag(instance.id, instance.updated_at), instance.updated_at
+
+
+def _http_date(value: datetime):
+    """Format a naive UTC datetime as an HTTP date."""
+    return format_datetime(value.replace(tzinfo=timezone.utc), usegmt=True)
+
+
+def _opaque_tag(tag: str):
+    """Strip the weakness indicator of an entity tag."""
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def _is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]):
+    """Evaluate If-None-Match, or If-Modified-Since when there is no If-None-Match."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [_opaque_tag(tag.strip()) for tag in if_none_match.split(",")]
+        # Weak comparison, the W/ prefix is ignored
+        return "*" in tags or _opaque_tag(etag) in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+
+    # HTTP dates have a precision of one second
+    modified = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+    return modified <= since
+
+
+def check_conditional(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+):
+    """Handle the conditional headers of a GET request.
+
+    Args:
+        request (Request): Incoming request.
+        response (Response): Response whose headers are sent with the result.
+        etag (str): Current ETag of the resource.
+        last_modified (datetime, optional): Current modification time of the resource.
+
+    Returns:
+        Response | None: A 304 response if the client copy is still fresh, otherwise
+            None, and the validators are set on `response`.
+    """
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = _http_date(last_modified)
+
+    if _is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return None
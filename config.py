@@ -0,0 +1,93 @@
+import os
+from dotenv import load_dotenv
+
+# Load environment variables from a .env file, if present
+load_dotenv()
+
+
+class Settings:
+    """
+    Application settings, read from environment variables.
+    """
+
+    def __init__(self):
+        # Database URL used by the sync engine
+        self.DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///database.db")
+        # Database URL used by the async engine, it must use an async driver
+        self.ASYNC_DATABASE_URL = os.getenv(
+            "ASYNC_DATABASE_URL", "sqlite+aiosqlite:///database.db"
+        )
+        # Serve the user and task handlers with the async engine
+        self.DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+        # Connections kept open by the write and read engines of an SQLite file
+        self.WRITE_POOL_SIZE = int(os.getenv("WRITE_POOL_SIZE", "5"))
+        self.READ_POOL_SIZE = int(os.getenv("READ_POOL_SIZE", "10"))
+        # SQLite PRAGMAs run on every connection, see `database.tune_sqlite`
+        self.SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+        # Page cache per connection, negative values are in KiB (64 MiB)
+        self.SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))
+        # Bytes of the database file read through memory mapping (256 MiB)
+        self.SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", "268435456"))
+        # Milliseconds a connection waits for a lock before "database is locked"
+        self.SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+        # Key signing the access tokens, required unless DEBUG is set
+        self.SECRET_KEY = os.getenv("SECRET_KEY")
+        # Minutes an access token issued by POST /auth/login stays valid
+        self.ACCESS_TOKEN_EXPIRE_MINUTES = int(
+            os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+        )
+        # Authenticated users kept in memory, and seconds before they are reloaded
+        self.PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024"))
+        self.PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+        # Number of processes used to hash and verify passwords
+        self.HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+        # Maximum number of items accepted by bulk endpoints in one request
+        self.MAX_BULK_SIZE = int(os.getenv("MAX_BULK_SIZE", "1000"))
+        # Maximum number of rows kept by each lookup cache, 0 disables caching
+        self.CACHE_MAXSIZE = int(os.getenv("CACHE_MAXSIZE", "10000"))
+        # Seconds a cached row stays valid
+        self.CACHE_TTL = float(os.getenv("CACHE_TTL", "60"))
+        # Resolve the email domain with DNS when validating emails, off by default
+        self.EMAIL_CHECK_DELIVERABILITY = os.getenv(
+            "EMAIL_CHECK_DELIVERABILITY", "false"
+        ).lower() in ("1", "true", "yes")
+        # Number of validated email addresses kept in memory
+        self.EMAIL_CACHE_SIZE = int(os.getenv("EMAIL_CACHE_SIZE", "4096"))
+        # Record request metrics and serve them at /metrics
+        self.METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in (
+            "1",
+            "true",
+            "yes",
+        )
+        # Debug mode, adds the X-DB-Queries and X-DB-Time headers to responses
+        self.DEBUG = os.getenv("DEBUG", "false").lower() in ("1", "true", "yes")
+        # Statements slower than this many milliseconds are logged
+        self.SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+        # Statements executed this many times in one request are logged as N+1
+        self.N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+        # Maximum number of tasks deleted per transaction by the bulk delete
+        self.DELETE_CHUNK_SIZE = int(os.getenv("DELETE_CHUNK_SIZE", "1000"))
+        # Pause between bulk delete chunks in milliseconds, lets other writers in
+        self.DELETE_CHUNK_PAUSE_MS = float(os.getenv("DELETE_CHUNK_PAUSE_MS", "10"))
+        # Maximum number of tasks changed per transaction by the batch reassignment
+        self.REASSIGN_CHUNK_SIZE = int(os.getenv("REASSIGN_CHUNK_SIZE", "1000"))
+        # Pause between batch reassignment chunks in milliseconds, lets other writers in
+        self.REASSIGN_CHUNK_PAUSE_MS = float(os.getenv("REASSIGN_CHUNK_PAUSE_MS", "10"))
+        # Number of jobs run at the same time by the job runner
+        self.JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+        # Seconds between the heartbeats of the jobs of a process
+        self.JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "10"))
+        # Seconds without heartbeat after which a queued or running job is failed
+        self.JOB_STALE_AFTER = float(os.getenv("JOB_STALE_AFTER", "60"))
+        # Events buffered per change feed subscriber, slower subscribers are dropped
+        self.FEED_QUEUE_SIZE = int(os.getenv("FEED_QUEUE_SIZE", "100"))
+        # Seconds between keepalive messages on idle change feed connections
+        self.FEED_HEARTBEAT = float(os.getenv("FEED_HEARTBEAT", "15"))
+        # Default number of items returned by list endpoints
+        self.DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+        # Hard upper bound for the `limit` query parameter of list endpoints
+        self.MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
+
+
+# Settings instance shared across the application
+settings = Settings()
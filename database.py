@@ -1,27 +1,247 @@
+import threading
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import engine, create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session, sessionmaker
+import config
+from query_stats import instrument_engine
 
-# Database URL
-SQLALCHEMY_DATABASE_URL = "sqlite:///database.db"
+# Settings the engines are built from, see `configure`
+_settings = config.settings
 
-# Create the SQLAlchemy engine
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# Engines, created on first use so importing the models does not open the database
+_engine = None
+_read_engine = None
+_async_engine = None
+_async_session_factory = None
 
-# Create a session factory
-SessionLocal = sessionmaker(bind=engine)
+# Sessions are first made in worker threads, only one of them creates the engine
+_engine_lock = threading.Lock()
+
+
+class LazySessionmaker(sessionmaker):
+    """
+    Session factory that binds itself to an engine when the first session is made.
+    """
+
+    def __init__(self, engine_getter=None, **kw):
+        super().__init__(**kw)
+        # Resolved on first use, the engine getters are defined below
+        self.engine_getter = engine_getter
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=(self.engine_getter or get_engine)())
+        return super().__call__(**local_kw)
+
+
+class ReadOnlySession(Session):
+    """
+    Session of the read engine, it refuses to flush so it can never write.
+    """
+
+    def flush(self, objects=None):
+        if self._is_clean():
+            return
+        raise InvalidRequestError("Read-only session, changes can not be flushed")
+
+
+# Create a session factory, instances stay loaded after commit so handlers can
+# build their response without a refresh SELECT
+SessionLocal = LazySessionmaker(expire_on_commit=False)
+
+# Session factory of the read engine, for handlers and exports that only read
+ReadSessionLocal = LazySessionmaker(
+    engine_getter=lambda: get_read_engine(),
+    class_=ReadOnlySession,
+    autoflush=False,
+    expire_on_commit=False,
+)
 
 # Base class for declarative models
 Base = declarative_base()
 
 
+def configure(settings: config.Settings):
+    """Build the engines from other settings, used by the application factory.
+
+    Engines created with the previous settings are disposed.
+
+    Args:
+        settings (Settings): Settings holding the database URLs.
+    """
+    global _settings, _engine, _read_engine, _async_engine, _async_session_factory
+    if settings is _settings:
+        return
+
+    for engine in (_engine, _read_engine):
+        if engine is not None:
+            engine.dispose()
+    _settings = settings
+    _engine = _read_engine = _async_engine = _async_session_factory = None
+    SessionLocal.configure(bind=None)
+    ReadSessionLocal.configure(bind=None)
+
+
+def _is_sqlite_file(url: str):
+    """Whether a database URL points to an SQLite database file."""
+    return url.startswith("sqlite") and url.split("///", 1)[-1] not in ("", ":memory:")
+
+
+def tune_sqlite(engine, read_only: bool = False):
+    """Run the PRAGMAs of the `SQLITE_*` settings on every new connection.
+
+    WAL mode lets readers go on while a transaction writes, they no longer wait
+    for the rollback journal. `synchronous=NORMAL` only syncs at checkpoints in
+    WAL mode, and `busy_timeout` makes writers wait for the lock instead of
+    failing with "database is locked".
+
+    Args:
+        engine (Engine): Sync engine, or the `sync_engine` of an async engine.
+        read_only (bool, optional): Reject writes on the connections. Defaults
+            to False.
+    """
+    pragmas = [
+        "PRAGMA journal_mode=WAL",
+        f"PRAGMA synchronous={_settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA cache_size={_settings.SQLITE_CACHE_SIZE}",
+        f"PRAGMA mmap_size={_settings.SQLITE_MMAP_SIZE}",
+        f"PRAGMA busy_timeout={_settings.SQLITE_BUSY_TIMEOUT_MS}",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def _create_engine(url: str, pool_size: int, read_only: bool = False):
+    """Create an instrumented engine, with the SQLite tuning for database files."""
+    if not _is_sqlite_file(url):
+        engine = create_engine(url)
+    else:
+        engine = create_engine(url, pool_size=pool_size)
+        tune_sqlite(engine, read_only=read_only)
+    # Count and time the statements of each request
+    instrument_engine(engine)
+    return engine
+
+
+def get_engine():
+    """Get the SQLAlchemy engine used to write, creating it on first use.
+
+    Returns:
+        Engine: The sync engine.
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = _create_engine(_settings.DATABASE_URL, _settings.WRITE_POOL_SIZE)
+    return _engine
+
+
+def get_read_engine():
+    """Get the SQLAlchemy engine used to read, creating it on first use.
+
+    It has its own pool, so readers never wait for a connection held by a
+    writer. Its SQLite connections are query only. Other databases share the
+    write engine.
+
+    Returns:
+        Engine: The sync read engine.
+    """
+    global _read_engine
+    if not _is_sqlite_file(_settings.DATABASE_URL):
+        return get_engine()
+    with _engine_lock:
+        if _read_engine is None:
+            _read_engine = _create_engine(
+                _settings.DATABASE_URL, _settings.READ_POOL_SIZE, read_only=True
+            )
+    return _read_engine
+
+
+def get_async_engine():
+    """Get the async SQLAlchemy engine, creating it on first use.
+
+    Returns:
+        AsyncEngine: The async engine.
+    """
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        _async_engine = create_async_engine(_settings.ASYNC_DATABASE_URL)
+        if _is_sqlite_file(_settings.ASYNC_DATABASE_URL):
+            tune_sqlite(_async_engine.sync_engine)
+        instrument_engine(_async_engine.sync_engine)
+    return _async_engine
+
+
+def get_async_session_factory():
+    """Get the async session factory, creating it on first use.
+
+    Returns:
+        async_sessionmaker: The async session factory.
+    """
+    global _async_session_factory
+    if _async_session_factory is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        # Attributes must stay loaded after commit, lazy loads are not allowed in async code
+        _async_session_factory = async_sessionmaker(
+            bind=get_async_engine(), expire_on_commit=False
+        )
+    return _async_session_factory
+
+
+def __getattr__(name):
+    # The engines stay importable as attributes, they are created on access
+    if name == "engine":
+        return get_engine()
+    if name == "read_engine":
+        return get_read_engine()
+    if name == "async_engine":
+        return get_async_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def get_db():
     """
-    Dependency function to get a database session.
+    Dependency function to get a database session, for handlers that write.
+
+    The handler commits its unit of work once, changes it did not commit are
+    rolled back when the session is closed.
     """
     session = SessionLocal()
     try:
         yield session
-        session.commit()
     finally:
         session.close()
+
+
+def get_read_db():
+    """
+    Dependency function to get a read-only database session, for GET handlers.
+
+    It is bound to the read engine, never flushes and is rolled back when closed.
+    """
+    session = ReadSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+async def get_async_db():
+    """
+    Dependency function to get an async database session.
+
+    As with `get_db`, the handler commits its own changes.
+    """
+    async with get_async_session_factory()() as session:
+        yield session
@@ -0,0 +1,104 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from fastapi.responses import StreamingResponse
+from database import ReadSessionLocal
+
+# Number of rows fetched from the database cursor per round-trip
+EXPORT_CHUNK_SIZE = 1000
+
+
+class ExportFormat(str, Enum):
+    """
+    Represents the output format of an export.
+
+    Inherits from the `str` class and the `Enum` class.
+    """
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+def _to_json(value):
+    """Convert values that `json` cannot encode into strings."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _ndjson_chunks(columns: list, partitions):
+    """Yield one NDJSON document per row, one chunk per fetched partition."""
+    names = [column.key for column in columns]
+    for rows in partitions:
+        yield "".join(
+            json.dumps(dict(zip(names, row)), default=_to_json) + "\n" for row in rows
+        )
+
+
+def _csv_chunks(columns: list, partitions):
+    """Yield a CSV header followed by one chunk of rows per fetched partition."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.key for column in columns])
+    for rows in partitions:
+        writer.writerows(
+            [
+                value.isoformat() if isinstance(value, datetime) else value
+                for value in row
+            ]
+            for row in rows
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    # Emit the header even if the table is empty
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _stream(statement, columns: list, export_format: ExportFormat):
+    """Run the statement in its own session and encode its rows as they arrive.
+
+    The session is owned by the generator because the response is streamed after
+    the request scoped session has been closed.
+    """
+    session = ReadSessionLocal()
+    try:
+        result = session.execute(
+            statement.execution_options(yield_per=EXPORT_CHUNK_SIZE)
+        )
+        partitions = result.partitions()
+
+        if export_format == ExportFormat.CSV:
+            yield from _csv_chunks(columns, partitions)
+        else:
+            yield from _ndjson_chunks(columns, partitions)
+    finally:
+        session.close()
+
+
+def export_response(statement, columns: list, export_format: ExportFormat, name: str):
+    """Build a streaming response that exports the rows selected by a statement.
+
+    Args:
+        statement (Select): Statement selecting the exported columns.
+        columns (list): Exported columns, in the order of the statement.
+        export_format (ExportFormat): Format of the exported rows.
+        name (str): File name of the export, without extension.
+
+    Returns:
+        StreamingResponse: Response streaming the encoded rows.
+    """
+    media_type = (
+        "text/csv" if export_format == ExportFormat.CSV else "application/x-ndjson"
+    )
+    return StreamingResponse(
+        _stream(statement, columns, export_format),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{name}.{export_format.value}"'
+        },
+    )
@@ -1,16 +1,123 @@
-from fastapi import FastAPI
-from router import api_router
+import logging
+import secrets
+from fastapi import FastAPI, Response
+from config import settings
+from metrics import MetricsMiddleware, MetricsRegistry
+from query_stats import QueryStatsMiddleware
 
-# Create a FastAPI instance
-app = FastAPI()
 
-# Include the API router
-app.include_router(api_router)
+logger = logging.getLogger(__name__)
 
+# Application of this process, built by the first `create_app` call
+_app = None
 
-@app.get("/health")
-def health():
-    """
-    Health check endpoint.
+
+def create_app():
+    """Build the FastAPI application of this process.
+
+    Routers are imported here, and the engine, password hashing context and email
+    validator are created on first use, so importing this module is cheap. Every
+    part of the application reads the shared `config.settings`, and the routes
+    are registered on module level routers, so the application is built once:
+    later calls return the same object. Run it with
+    `uvicorn main:create_app --factory`.
+
+    Raises:
+        RuntimeError: If `SECRET_KEY` is not set outside of debug mode.
+
+    Returns:
+        FastAPI: The application.
     """
-    return {"health": "Good"}
+    global _app
+    if _app is not None:
+        return _app
+
+    if not settings.SECRET_KEY:
+        if not settings.DEBUG:
+            raise RuntimeError(
+                "SECRET_KEY must be set to sign the access tokens, see .env.example, "
+                "or set DEBUG=true to use a random key in development"
+            )
+        # Debug only, the tokens are lost on restart and not shared between workers
+        settings.SECRET_KEY = secrets.token_urlsafe(32)
+        logger.warning("SECRET_KEY is not set, using a random key for this process")
+
+    import database
+    from router import create_api_router
+    from authentications import shutdown_hash_executor
+    from src.job.services import fail_interrupted_jobs, shutdown_job_executor
+    from src.user.services import user_cache, principal_cache
+    from src.task.services import task_cache
+
+    database.configure(settings)
+
+    # Create a FastAPI instance
+    app = FastAPI()
+
+    # Include the API router
+    app.include_router(create_api_router())
+
+    # Count the SQL statements of each request
+    app.add_middleware(QueryStatsMiddleware)
+
+    # Request metrics, served at /metrics when enabled
+    metrics_registry = app.state.metrics_registry = MetricsRegistry()
+
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware, registry=metrics_registry)
+
+        @app.get("/metrics")
+        async def metrics():
+            """
+            Request metrics in the Prometheus text format.
+            """
+            return Response(
+                metrics_registry.render(), media_type="text/plain; version=0.0.4"
+            )
+
+    @app.get("/health")
+    def health():
+        """
+        Health check endpoint.
+        """
+        return {"health": "Good"}
+
+    @app.get("/cache/stats")
+    def cache_stats():
+        """
+        Hit, miss and eviction counters of the lookup caches.
+        """
+        return {
+            "users": user_cache.stats(),
+            "tasks": task_cache.stats(),
+            "principals": principal_cache.stats(),
+        }
+
+    @app.on_event("startup")
+    def startup():
+        """
+        Open the first database connection before serving requests, and fail the
+        jobs whose process stopped without finishing them.
+        """
+        with database.get_engine().connect():
+            pass
+        fail_interrupted_jobs()
+
+    @app.on_event("shutdown")
+    def shutdown():
+        """
+        Stop the password hashing processes and the job threads.
+        """
+        shutdown_hash_executor()
+        shutdown_job_executor()
+
+    _app = app
+    return app
+
+
+def __getattr__(name):
+    # `main:app` keeps working, the application is built on first access
+    if name == "app":
+        app = globals()["app"] = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
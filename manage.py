@@ -0,0 +1,44 @@
+import argparse
+from database import SessionLocal
+from src.task.services import rebuild_task_stats
+from src.task.search import rebuild_task_search
+
+
+def rebuild_task_stats_command():
+    """
+    Recompute the task_stats aggregate table from the tasks table.
+    """
+    session = SessionLocal()
+    try:
+        rebuild_task_stats(session.connection())
+        session.commit()
+    finally:
+        session.close()
+    print("Task stats rebuilt")
+
+
+def backfill_task_search_command():
+    """
+    Rebuild the tasks_fts search index from the tasks table.
+    """
+    session = SessionLocal()
+    try:
+        rebuild_task_search(session.connection())
+        session.commit()
+    finally:
+        session.close()
+    print("Task search index rebuilt")
+
+
+# Available commands, by name
+COMMANDS = {
+    "rebuild-task-stats": rebuild_task_stats_command,
+    "backfill-task-search": backfill_task_search_command,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintenance commands.")
+    parser.add_argument("command", choices=COMMANDS)
+    args = parser.parse_args()
+    COMMANDS[args.command]()
@@ -0,0 +1,253 @@
+import time
+from bisect import bisect_left
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Upper bounds of the request and response size histogram buckets, in bytes
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# Quantiles estimated from the latency histograms
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Route label of requests that did not match any route, keeps label cardinality bounded
+UNMATCHED_ROUTE = "unmatched"
+
+
+class Histogram:
+    """
+    Cumulative histogram with fixed buckets, in the Prometheus format.
+    """
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        # One extra bucket for the values above the last bound (+Inf)
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """Record one value."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float):
+        """Estimate a quantile by linear interpolation inside its bucket.
+
+        Args:
+            q (float): Quantile to estimate, between 0 and 1.
+
+        Returns:
+            float: Estimated value, or 0 if nothing was observed.
+        """
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = self.bounds[index - 1] if index else 0.0
+                if index == len(self.bounds):
+                    # No upper bound for the +Inf bucket
+                    return lower
+                upper = self.bounds[index]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1]
+
+    def buckets(self):
+        """Yield (upper bound label, cumulative count) pairs, +Inf included."""
+        cumulative = 0
+        for bound, count in zip(self.bounds + ("+Inf",), self.counts):
+            cumulative += count
+            yield bound, cumulative
+
+
+class MetricsRegistry:
+    """
+    Request metrics collected by `MetricsMiddleware`.
+
+    Updates happen on the event loop thread only, so no lock is needed.
+    """
+
+    def __init__(self):
+        self.requests = {}
+        self.latency = {}
+        self.request_size = {}
+        self.response_size = {}
+        self.in_flight = 0
+
+    def observe(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        duration: float,
+        request_bytes: int,
+        response_bytes: int,
+    ):
+        """Record one finished request."""
+        key = (method, route, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+
+        key = (method, route)
+        latency = self.latency.get(key)
+        if latency is None:
+            latency = self.latency[key] = Histogram(LATENCY_BUCKETS)
+            self.request_size[key] = Histogram(SIZE_BUCKETS)
+            self.response_size[key] = Histogram(SIZE_BUCKETS)
+        latency.observe(duration)
+        self.request_size[key].observe(request_bytes)
+        self.response_size[key].observe(response_bytes)
+
+    def render(self):
+        """Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics page.
+        """
+        lines = [
+            "# HELP http_requests_total Total number of HTTP requests.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(self.requests.items()):
+            lines.append(
+                f'http_requests_total{{method="{method}",route="{route}",'
+                f'status="{status}"}} {count}'
+            )
+
+        lines += [
+            "# HELP http_requests_in_flight Number of HTTP requests being served.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+        ]
+
+        self._render_histograms(
+            lines,
+            "http_request_duration_seconds",
+            "HTTP request latency.",
+            self.latency,
+        )
+        self._render_histograms(
+            lines,
+            "http_request_size_bytes",
+            "HTTP request body size.",
+            self.request_size,
+        )
+        self._render_histograms(
+            lines,
+            "http_response_size_bytes",
+            "HTTP response body size.",
+            self.response_size,
+        )
+
+        lines += [
+            "# HELP http_request_duration_quantile_seconds "
+            "Latency quantiles estimated from the histogram buckets.",
+            "# TYPE http_request_duration_quantile_seconds gauge",
+        ]
+        for (method, route), histogram in sorted(self.latency.items()):
+            for q in QUANTILES:
+                lines.append(
+                    f"http_request_duration_quantile_seconds"
+                    f'{{method="{method}",route="{route}",quantile="{q}"}} '
+                    f"{histogram.quantile(q):.6f}"
+                )
+
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histograms(lines: list, name: str, description: str, histograms):
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+        for (method, route), histogram in sorted(histograms.items()):
+            labels = f'method="{method}",route="{route}"'
+            for bound, count in histogram.buckets():
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+
+def route_template(scope):
+    """Get the path template of the route that served a request, e.g. /tasks/{task_id}.
+
+    The router stores the matched endpoint in the scope, the template is looked up
+    from it so the label does not depend on path parameter values.
+    """
+    endpoint = scope.get("endpoint")
+    app = scope.get("app")
+    if endpoint is None or app is None:
+        return UNMATCHED_ROUTE
+
+    templates = getattr(app.state, "route_templates", None)
+    if templates is None:
+        templates = app.state.route_templates = {
+            route.endpoint: route.path
+            for route in app.routes
+            if getattr(route, "endpoint", None) is not None
+        }
+    return templates.get(endpoint, UNMATCHED_ROUTE)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording per route counts, latencies and sizes.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        start = time.perf_counter()
+        status = 500
+        response_bytes = 0
+
+        async def send_wrapper(message):
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        registry.in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            registry.in_flight -= 1
+            request_bytes = 0
+            for name, value in scope["headers"]:
+                if name == b"content-length":
+                    request_bytes = int(value)
+                    break
+            registry.observe(
+                scope["method"],
+                route_template(scope),
+                status,
+                time.perf_counter() - start,
+                request_bytes,
+                response_bytes,
+            )
@@ -0,0 +1,135 @@
+import base64
+import json
+from datetime import datetime
+from typing import Generic, List, Optional, TypeVar
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import DateTime, tuple_
+
+T = TypeVar("T")
+
+
+class PageSchema(BaseModel, Generic[T]):
+    """
+    Represents one page of a keyset paginated collection.
+    """
+
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(values: list):
+    """Encode the keyset values of the last row of a page into an opaque cursor.
+
+    Args:
+        values (list): JSON serializable keyset values.
+
+    Returns:
+        str: URL safe cursor string.
+    """
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Decode a cursor created by `encode_cursor`.
+
+    Args:
+        cursor (str): Cursor received from the client.
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+
+    Returns:
+        list: Keyset values stored in the cursor.
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+    if not isinstance(values, list) or not values:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return values
+
+
+def _cursor_value(value):
+    """Convert a keyset value into a JSON serializable value."""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def keyset(
+    query,
+    id_column,
+    limit: int,
+    after: Optional[str] = None,
+    sort_column=None,
+    descending: bool = False,
+):
+    """Restrict a query to the page that follows the given cursor.
+
+    Rows are ordered by `sort_column` then `id_column`, so the keyset stays unique
+    when the sort column has duplicates. One extra row is fetched so `build_page`
+    can tell whether a next page exists.
+
+    Args:
+        query (Query | Select): Query to paginate.
+        id_column (Column): Unique, indexed column the keyset is built on.
+        limit (int): Maximum number of items in the page.
+        after (str, optional): Cursor returned with the previous page.
+        sort_column (Column, optional): Column to sort by. Defaults to `id_column`.
+        descending (bool, optional): Sort in descending order. Defaults to False.
+
+    Raises:
+        HTTPException: If the cursor does not match the sort order.
+
+    Returns:
+        Query | Select: The paginated query.
+    """
+    if sort_column is None or sort_column is id_column:
+        columns = [id_column]
+    else:
+        columns = [sort_column, id_column]
+
+    if after:
+        values = decode_cursor(after)
+        if len(values) != len(columns) or not isinstance(values[-1], int):
+            raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+        if len(columns) == 2 and isinstance(sort_column.type, DateTime):
+            try:
+                values[0] = datetime.fromisoformat(values[0])
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+        # Row value comparison, so SQLite can seek the (sort, id) index
+        position = tuple_(*columns) if len(columns) == 2 else columns[0]
+        last = tuple_(*values) if len(columns) == 2 else values[0]
+        query = query.filter(position < last if descending else position > last)
+
+    order = [column.desc() if descending else column.asc() for column in columns]
+    return query.order_by(*order).limit(limit + 1)
+
+
+def build_page(rows: list, limit: int, sort_key: Optional[str] = None):
+    """Split the rows fetched by a `keyset` query into items and the next cursor.
+
+    Args:
+        rows (list): Rows returned by the paginated query.
+        limit (int): Maximum number of items in the page.
+        sort_key (str, optional): Attribute of the sort column, when the rows are
+            not sorted by id.
+
+    Returns:
+        tuple: Items of the page and the cursor of the next page (or None).
+    """
+    items = rows[:limit]
+    if len(rows) <= limit:
+        return items, None
+
+    last = items[-1]
+    values = [last.id]
+    if sort_key and sort_key != "id":
+        values.insert(0, _cursor_value(getattr(last, sort_key)))
+    return items, encode_cursor(values)
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+from typing import Callable, Optional
+
+# Queued in place of the pending events when a subscriber is dropped
+DROPPED = object()
+
+
+class Subscription:
+    """
+    Events of a `PubSub` bus delivered to one consumer, in a bounded queue.
+
+    Iterate it with `async for` on the event loop it was created on. The iteration
+    stops when the consumer fell too far behind and was dropped; check `dropped`.
+    """
+
+    def __init__(self, maxsize: int, predicate: Optional[Callable] = None):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.predicate = predicate
+        self.dropped = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        event = await self.queue.get()
+        if event is DROPPED:
+            raise StopAsyncIteration
+        return event
+
+
+class PubSub:
+    """
+    In-process publish/subscribe bus fanning events out to asyncio consumers.
+
+    Events can be published from any thread. Each subscriber has a bounded queue,
+    a subscriber whose queue is full is dropped rather than slowing the publisher
+    down or buffering without limit.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, predicate: Optional[Callable] = None):
+        """Start receiving events, must be called on the consumer event loop.
+
+        Args:
+            predicate (Callable, optional): Only the events it returns True for are
+                delivered. Defaults to every event.
+
+        Returns:
+            Subscription: The new subscription.
+        """
+        subscription = Subscription(self.maxsize, predicate)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Stop delivering events to a subscription."""
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event):
+        """Deliver an event to every matching subscription, from any thread.
+
+        Args:
+            event (Any): Event to deliver, it is shared by the subscribers.
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+            self.published += 1
+
+        # Filter here, and hop to each event loop once
+        by_loop = {}
+        for subscription in subscriptions:
+            if subscription.predicate is None or subscription.predicate(event):
+                by_loop.setdefault(subscription.loop, []).append(subscription)
+        for loop, targets in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(self._deliver, targets, event)
+            except RuntimeError:
+                # The event loop is closed, its subscribers are gone
+                for subscription in targets:
+                    self.unsubscribe(subscription)
+
+    def _deliver(self, subscriptions: list, event):
+        """Queue an event for subscriptions of the current event loop."""
+        for subscription in subscriptions:
+            if subscription.dropped:
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._drop(subscription)
+
+    def _drop(self, subscription: Subscription):
+        """Disconnect a subscriber that does not keep up with the events."""
+        with self._lock:
+            self._subscriptions.discard(subscription)
+            self.dropped += 1
+        subscription.dropped = True
+        # Replace the pending events with the end of stream marker
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(DROPPED)
+
+    def stats(self):
+        """Get the bus counters.
+
+        Returns:
+            dict: Number of subscribers, published events and dropped subscribers.
+        """
+        with self._lock:
+            subscribers = len(self._subscriptions)
+        return {
+            "subscribers": subscribers,
+            "published": self.published,
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,115 @@
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from config import settings
+from metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """
+    SQL statements executed while serving one request.
+    """
+
+    __slots__ = ("scope", "count", "duration", "shapes")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.count = 0
+        self.duration = 0.0
+        # Number of executions of each statement, parameters are bound separately
+        # so the SQL text is the shape of the statement
+        self.shapes = Counter()
+
+    @property
+    def route(self):
+        """Path template of the route serving the request."""
+        return route_template(self.scope)
+
+
+# Stats of the request being served, copied into the worker threads of sync handlers
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "query_stats", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context of the statement, not on the pooled connection,
+    # so a statement that raises leaves nothing behind
+    if context is not None:
+        context.query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "query_start", None)
+    duration = time.perf_counter() - start if start is not None else 0.0
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += duration
+        stats.shapes[statement] += 1
+
+    if duration * 1000 >= settings.SLOW_QUERY_MS:
+        logger.warning(
+            "Slow query (%.1f ms) on route %s: %s",
+            duration * 1000,
+            stats.route if stats is not None else "-",
+            statement,
+        )
+
+
+def instrument_engine(engine):
+    """Count and time every statement executed by an engine.
+
+    Args:
+        engine (Engine): Sync engine, use `AsyncEngine.sync_engine` for async ones.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """
+    Pure ASGI middleware collecting the SQL statements of each request.
+
+    Statement shapes repeated `N_PLUS_ONE_THRESHOLD` times or more in one request
+    are logged as likely N+1 patterns. In `DEBUG` mode, the X-DB-Queries and
+    X-DB-Time (milliseconds) headers are added to the response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope)
+        token = _current_stats.set(stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and settings.DEBUG:
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (b"x-db-queries", str(stats.count).encode()),
+                    (b"x-db-time", f"{stats.duration * 1000:.2f}".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
+            for statement, count in stats.shapes.items():
+                if count >= settings.N_PLUS_ONE_THRESHOLD:
+                    logger.warning(
+                        "Possible N+1 on route %s: statement executed %d times: %s",
+                        stats.route,
+                        count,
+                        statement,
+                    )
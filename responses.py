@@ -0,0 +1,31 @@
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+class PreEncodedJSONResponse(Response):
+    """
+    JSON response whose body is already encoded to bytes.
+
+    FastAPI returns it as is, skipping `response_model` validation and
+    `jsonable_encoder`.
+    """
+
+    media_type = "application/json"
+
+
+def page_response(adapter: TypeAdapter, rows: list, next_cursor, response: Response):
+    """Serialize a page of database rows straight to JSON bytes.
+
+    Args:
+        adapter (TypeAdapter): Adapter of the page schema.
+        rows (list): Rows of the page, selected as plain columns.
+        next_cursor (str | None): Cursor of the next page.
+        response (Response): Response holding the headers to send, e.g. the ETag.
+
+    Returns:
+        PreEncodedJSONResponse: The encoded page.
+    """
+    page = adapter.validate_python(
+        {"items": [row._mapping for row in rows], "next_cursor": next_cursor}
+    )
+    return PreEncodedJSONResponse(adapter.dump_json(page), headers=response.headers)
@@ -1,13 +1,44 @@
 from fastapi import APIRouter
-from src.user.routers import router as user_router
-from src.task.routers import router as task_router
+from config import settings
 
-# Create an APIRouter instance
-api_router = APIRouter()
 
+def create_api_router():
+    """Build the API router holding the auth, user, task and job endpoints.
 
-# Include the user router
-api_router.include_router(user_router)
+    The auth, user, task and job modules are imported here rather than at module
+    level, so importing this module stays cheap.
 
-# Include the product router
-api_router.include_router(task_router)
+    `DB_ASYNC` selects the user and task handlers, once per process.
+
+    Returns:
+        APIRouter: Router including every auth, user, task and job route.
+    """
+    from src.user.routers import router as user_router
+    from src.task.routers import router as task_router
+    from src.job.routers import router as job_router
+    from src.auth.routers import router as auth_router
+
+    # Register the user and task job kinds
+    import src.user.jobs  # noqa: F401
+    import src.task.jobs  # noqa: F401
+
+    if settings.DB_ASYNC:
+        # Replace the sync user and task handlers with their async counterparts
+        import src.user.async_routers  # noqa: F401
+        import src.task.async_routers  # noqa: F401
+
+    # Create an APIRouter instance
+    api_router = APIRouter()
+
+    # Include the user router
+    api_router.include_router(user_router)
+
+    # Include the product router
+    api_router.include_router(task_router)
+
+    # Include the job router
+    api_router.include_router(job_router)
+
+    # Include the auth router
+    api_router.include_router(auth_router)
+    return api_router
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from authentications import create_access_token
+from config import settings
+from database import get_read_db
+from src.auth.schemas import LoginPayloadSchema, TokenResponseSchema
+from src.auth.services import authenticate_user
+
+# Create the router of the authentication endpoints
+router = APIRouter(tags=["Auth"], prefix="/auth")
+
+
+@router.post("/login", response_model=TokenResponseSchema)
+async def login(payload: LoginPayloadSchema, db: Session = Depends(get_read_db)):
+    """Verify the credentials of a user and issue an access token
+
+    Send the token as `Authorization: Bearer <token>` to the endpoints that
+    require authentication, until it expires.
+
+    Args:
+        payload (LoginPayloadSchema): Username and password of the user.
+        db (Session, optional): Database session object. Defaults to Depends(get_read_db).
+
+    Returns:
+        TokenResponseSchema: The access token and its lifetime in seconds
+    """
+    user = await authenticate_user(
+        username=payload.username, password=payload.password, db=db
+    )
+    return TokenResponseSchema(
+        access_token=create_access_token(user.id),
+        expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    )
@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+
+
+class LoginPayloadSchema(BaseModel):
+    """
+    Represents the credentials sent to log in.
+    """
+
+    username: str
+    password: str
+
+
+class TokenResponseSchema(BaseModel):
+    """
+    Represents an issued access token.
+    """
+
+    access_token: str
+    token_type: str = "bearer"
+    # Seconds the token stays valid
+    expires_in: int
@@ -0,0 +1,118 @@
+from typing import Optional
+from fastapi import Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from authentications import decode_access_token, verify_password_async
+from database import ReadSessionLocal
+from src.user.models import User
+from src.user.services import principal_cache
+
+# Reads the token of the `Authorization: Bearer <token>` header, if any
+bearer_scheme = HTTPBearer(auto_error=False)
+
+# bcrypt hash verified when the user is unknown, with the same cost as the stored
+# hashes, so the response time does not tell which usernames exist
+DUMMY_PASSWORD_HASH = "$2b$12$PWiS7LpjUHFmZp352hg0sOqGhUFf7MGanonmIDxjzcarGOnlA94Pm"
+
+
+def _unauthorized(detail: str):
+    """Build a 401 error asking for a bearer token."""
+    return HTTPException(
+        status_code=401, detail=detail, headers={"WWW-Authenticate": "Bearer"}
+    )
+
+
+def _is_active(user: User):
+    """Check if a user may log in, `is_active` is only set to disable a user."""
+    return user.is_active is not False
+
+
+async def authenticate_user(username: str, password: str, db: Session):
+    """Check the credentials of a user, the only place bcrypt runs for a login
+
+    Args:
+        username (str): Username of the user.
+        password (str): Plain password to verify.
+        db (Session): Database session object.
+
+    Raises:
+        HTTPException: 401 if the user does not exist, is disabled or the password
+            does not match.
+
+    Returns:
+        User object: The authenticated user, detached from the session
+    """
+    generation = principal_cache.generation()
+    user = await run_in_threadpool(
+        db.scalar, select(User).where(User.username == username)
+    )
+    # Always run one bcrypt verify, whether the user exists or not
+    hashed_password = user.password if user is not None else None
+    verified = await verify_password_async(
+        password, hashed_password or DUMMY_PASSWORD_HASH
+    )
+    if not verified or not hashed_password or not _is_active(user):
+        raise _unauthorized("Incorrect username or password")
+
+    # The next requests of the user find it in memory
+    db.expunge(user)
+    principal_cache.set(user.id, user, generation)
+    return user
+
+
+def load_principal(user_id: int):
+    """Load an active user into the principal cache
+
+    Args:
+        user_id (int): ID of the user.
+
+    Returns:
+        User object: The detached user, or None if it does not exist or is disabled
+    """
+    # Taken before the SELECT, a user updated meanwhile is not cached
+    generation = principal_cache.generation()
+    with ReadSessionLocal() as session:
+        user = session.get(User, user_id)
+    if user is None or not _is_active(user):
+        return None
+
+    principal_cache.set(user_id, user, generation)
+    return user
+
+
+async def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+):
+    """Get the user authenticated by the bearer token of the request
+
+    The token is checked with an HMAC and the user comes from the principal cache,
+    the database is only read when the user is not cached. The returned object is
+    shared between requests and must not be modified.
+
+    Args:
+        credentials (HTTPAuthorizationCredentials, optional): Scheme and token of
+            the Authorization header. Defaults to Depends(bearer_scheme).
+
+    Raises:
+        HTTPException: 401 if the token is missing, invalid or expired, or if its
+            user was deleted or disabled.
+
+    Returns:
+        User object: The authenticated user
+    """
+    if credentials is None:
+        raise _unauthorized("Not authenticated")
+
+    user_id = decode_access_token(credentials.credentials)
+    if user_id is None:
+        raise _unauthorized("Invalid or expired token")
+
+    user = principal_cache.get(user_id)
+    if user is None:
+        # Cache miss, load the user off the event loop
+        user = await run_in_threadpool(load_principal, user_id)
+        if user is None:
+            raise _unauthorized("Invalid or expired token")
+    return user
@@ -0,0 +1,45 @@
+from database import Base
+from sqlalchemy import Column, Integer, DateTime, String, Boolean, JSON
+from datetime import datetime
+from enum import Enum
+
+
+class JobStatus(str, Enum):
+    """
+    Represents the state of a background job.
+
+    Inherits from the `str` class and the `Enum` class.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class Job(Base):
+    """
+    Represents a long running operation executed by the job runner.
+
+    See src/job/services.py.
+    """
+
+    __tablename__ = "jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)
+    status = Column(String, nullable=False, default=JobStatus.QUEUED.value, index=True)
+    params = Column(JSON)
+    progress = Column(Integer, nullable=False, default=0)
+    total = Column(Integer)
+    result = Column(JSON)
+    error = Column(String)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    # Process running the job and the last time it confirmed it is alive, jobs whose
+    # heartbeat is older than JOB_STALE_AFTER are failed by the other processes
+    owner = Column(String)
+    heartbeat_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
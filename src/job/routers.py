@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from database import get_db, get_read_db
+from src.job.schemas import JobCreatePayloadSchema, JobResponseSchema
+from src.job.services import cancel_job, get_job, submit_job
+
+# Create the router of the job endpoints
+router = APIRouter(tags=["Job"], prefix="/jobs")
+
+
+@router.post("", response_model=JobResponseSchema, status_code=202)
+def create_job(payload: JobCreatePayloadSchema):
+    """Start a long running operation in the background.
+
+    Args:
+        payload (JobCreatePayloadSchema): Kind of the job and its params.
+
+    Returns:
+        JobResponseSchema: The queued job, poll GET /jobs/{job_id} for its progress.
+    """
+    job = submit_job(payload.kind, payload.params)
+    return JobResponseSchema.from_orm(job)
+
+
+@router.get("/{job_id}", response_model=JobResponseSchema)
+def get_job_status(job_id: int, db: Session = Depends(get_read_db)):
+    """Get the status, progress and result of a job.
+
+    Args:
+        job_id (int): ID of the job to retrieve.
+        db (Session, optional): Database session object. Defaults to Depends(get_read_db).
+
+    Returns:
+        JobResponseSchema: The job.
+    """
+    return JobResponseSchema.from_orm(get_job(job_id, db=db))
+
+
+@router.post("/{job_id}/cancel", response_model=JobResponseSchema)
+def cancel(job_id: int, db: Session = Depends(get_db)):
+    """Cancel a queued or running job.
+
+    Args:
+        job_id (int): ID of the job to cancel.
+        db (Session, optional): Database session object. Defaults to Depends(get_db).
+
+    Returns:
+        JobResponseSchema: The job, `cancel_requested` is set.
+    """
+    return JobResponseSchema.from_orm(cancel_job(job_id, db=db))
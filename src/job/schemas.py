@@ -0,0 +1,45 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+class JobCreatePayloadSchema(BaseModel):
+    """
+    Represents the payload for starting a job.
+    """
+
+    kind: str
+    params: Dict[str, Any] = {}
+
+
+class JobNoParamsSchema(BaseModel):
+    """
+    Represents the params of a job kind that takes none.
+    """
+
+
+class JobResponseSchema(BaseModel):
+    """
+    Represents the state of a job.
+    """
+
+    id: int
+    kind: str
+    status: str
+    params: Optional[Dict[str, Any]] = None
+    progress: int
+    total: Optional[int] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    cancel_requested: bool
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        """
+        Configuration options for the schema.
+        """
+
+        # Enable automatic conversion from attributes to dict during model initialization
+        from_attributes = True
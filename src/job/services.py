@@ -0,0 +1,339 @@
+import logging
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, NamedTuple, Optional, Type
+from fastapi.exceptions import HTTPException
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from src.job.models import Job, JobStatus
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Thread pool running the jobs, created on first use
+_job_executor = None
+
+# Thread refreshing the heartbeat of the jobs of this process, and its stop signal
+_heartbeat_thread = None
+_heartbeat_stop = None
+
+# Statuses of the jobs that are not finished yet
+ACTIVE_STATUSES = [JobStatus.QUEUED.value, JobStatus.RUNNING.value]
+
+
+class JobKind(NamedTuple):
+    """
+    A kind of job that can be started with POST /jobs.
+    """
+
+    function: Callable
+    params_schema: Type[BaseModel]
+    summarize: Optional[Callable]
+
+
+# Registered job kinds, by name
+JOB_KINDS = {}
+
+
+class JobCancelled(Exception):
+    """
+    Raised inside a job when its cancellation was requested.
+    """
+
+
+def register_job_kind(
+    name: str, params_schema: Type[BaseModel], summarize: Optional[Callable] = None
+):
+    """Decorator registering a function as a kind of job.
+
+    The function is called as `function(job, params)` in a worker thread, with a
+    `JobContext` and the validated params, and returns a JSON serializable dict.
+    CPU heavy steps should be sent to a process pool from there, e.g. the hashing
+    pool of `authentications.get_hash_executor`.
+
+    Args:
+        name (str): Name of the kind, the `kind` of the POST /jobs payload.
+        params_schema (Type[BaseModel]): Schema validating the job params.
+        summarize (Callable, optional): Builds the params stored in the jobs table,
+            to keep large or secret values out of it. Defaults to every param.
+    """
+
+    def decorator(function):
+        JOB_KINDS[name] = JobKind(function, params_schema, summarize)
+        return function
+
+    return decorator
+
+
+class JobContext:
+    """
+    Handle given to a running job, to report its progress and honour cancellation.
+    """
+
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+
+    def report(self, progress: int, total: Optional[int] = None):
+        """Store the progress of the job, then stop it if it was cancelled.
+
+        Args:
+            progress (int): Units of work done so far.
+            total (int, optional): Units of work in the whole job, if known.
+
+        Raises:
+            JobCancelled: If the cancellation of the job was requested.
+        """
+        values = dict(progress=progress, heartbeat_at=datetime.utcnow())
+        if total is not None:
+            values["total"] = total
+        with SessionLocal() as session:
+            cancel_requested = session.execute(
+                update(Job)
+                .where(Job.id == self.job_id)
+                .values(**values)
+                .returning(Job.cancel_requested)
+            ).scalar()
+            session.commit()
+
+        if cancel_requested:
+            raise JobCancelled()
+
+
+def get_worker_id():
+    """Get the id stored as the owner of the jobs queued by this process.
+
+    Returns:
+        str: Host name and process id.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _beat(stop: threading.Event):
+    """Refresh the heartbeat of the jobs of this process and fail the stale ones."""
+    while not stop.wait(settings.JOB_HEARTBEAT_INTERVAL):
+        try:
+            with SessionLocal() as session:
+                session.execute(
+                    update(Job)
+                    .where(
+                        Job.owner == get_worker_id(), Job.status.in_(ACTIVE_STATUSES)
+                    )
+                    .values(heartbeat_at=datetime.utcnow())
+                )
+                session.commit()
+            fail_interrupted_jobs()
+        except Exception:
+            logger.exception("Job heartbeat failed")
+
+
+def get_job_executor():
+    """Get the thread pool running the jobs.
+
+    Jobs mostly wait on the database, so they run in threads, `JOB_WORKERS` at
+    a time. Extra jobs wait in the queue. A heartbeat thread is started along with
+    the pool, it keeps the jobs of this process from being failed as stale.
+
+    Returns:
+        ThreadPoolExecutor: The shared thread pool.
+    """
+    global _job_executor, _heartbeat_thread, _heartbeat_stop
+    if _job_executor is None:
+        _job_executor = ThreadPoolExecutor(
+            max_workers=settings.JOB_WORKERS, thread_name_prefix="job"
+        )
+        _heartbeat_stop = threading.Event()
+        _heartbeat_thread = threading.Thread(
+            target=_beat, args=(_heartbeat_stop,), name="job-heartbeat", daemon=True
+        )
+        _heartbeat_thread.start()
+    return _job_executor
+
+
+def shutdown_job_executor():
+    """Stop the job threads, if they were started. Queued jobs are dropped."""
+    global _job_executor, _heartbeat_thread, _heartbeat_stop
+    if _job_executor is not None:
+        _job_executor.shutdown(wait=False, cancel_futures=True)
+        _job_executor = None
+        _heartbeat_stop.set()
+        _heartbeat_thread = _heartbeat_stop = None
+
+
+def _finish(job_id: int, status: JobStatus, **values):
+    """Store the final state of a job, unless it was failed as stale meanwhile."""
+    with SessionLocal() as session:
+        session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == JobStatus.RUNNING.value)
+            .values(status=status.value, finished_at=datetime.utcnow(), **values)
+        )
+        session.commit()
+
+
+def _run_job(job_id: int, kind: JobKind, params: BaseModel):
+    """Run a job in a worker thread and record its outcome."""
+    with SessionLocal() as session:
+        # Only start the job if it was not cancelled while queued
+        started = session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == JobStatus.QUEUED.value)
+            .values(
+                status=JobStatus.RUNNING.value,
+                started_at=datetime.utcnow(),
+                heartbeat_at=datetime.utcnow(),
+            )
+        ).rowcount
+        session.commit()
+    if not started:
+        return
+
+    try:
+        result = kind.function(JobContext(job_id), params)
+    except JobCancelled:
+        _finish(job_id, JobStatus.CANCELLED)
+    except Exception as e:
+        logger.exception("Job %d failed", job_id)
+        _finish(job_id, JobStatus.FAILED, error=str(e) or type(e).__name__)
+    else:
+        _finish(job_id, JobStatus.SUCCEEDED, result=result)
+
+
+def submit_job(kind_name: str, params: dict):
+    """Store a new job and queue it on the job thread pool.
+
+    Args:
+        kind_name (str): Name of a registered job kind.
+        params (dict): Params of the job, validated against the kind schema.
+
+    Raises:
+        HTTPException: If the kind is unknown or the params are not valid.
+
+    Returns:
+        Job: The stored job, still queued.
+    """
+    kind = JOB_KINDS.get(kind_name)
+    if kind is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown job kind: {kind_name}, expected one of "
+            f"{', '.join(sorted(JOB_KINDS))}",
+        )
+
+    try:
+        validated = kind.params_schema.model_validate(params)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=400, detail=e.errors(include_url=False, include_context=False)
+        )
+
+    stored_params = (
+        kind.summarize(validated)
+        if kind.summarize
+        else validated.model_dump(mode="json", exclude_none=True)
+    )
+    with SessionLocal() as session:
+        job = Job(
+            kind=kind_name,
+            params=stored_params,
+            owner=get_worker_id(),
+            heartbeat_at=datetime.utcnow(),
+        )
+        session.add(job)
+        session.commit()
+
+    # The validated params are handed over in memory, only the summary is stored
+    get_job_executor().submit(_run_job, job.id, kind, validated)
+    return job
+
+
+def get_job(job_id: int, db: Session):
+    """Get a job based on its id
+
+    Args:
+        job_id (int): job id, which want to get.
+        db (Session): Database session object.
+
+    Raises:
+        HTTPException: Raise Exception, if id not exist in database.
+
+    Returns:
+        Job object: return job obj.
+    """
+    job = db.get(Job, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=400, detail=f"Job id: {job_id} not exist in database"
+        )
+
+    return job
+
+
+def cancel_job(job_id: int, db: Session):
+    """Request the cancellation of a job
+
+    A queued job is cancelled at once. A running job stops the next time it
+    reports progress, the work it already committed is kept. Each change is a
+    conditional UPDATE, so a job that just started or finished is not overwritten.
+
+    Args:
+        job_id (int): job id, which want to cancel.
+        db (Session): Database session object.
+
+    Returns:
+        Job object: return job obj.
+    """
+    # The worker skips jobs that are no longer queued
+    job = db.scalar(
+        update(Job)
+        .where(Job.id == job_id, Job.status == JobStatus.QUEUED.value)
+        .values(
+            status=JobStatus.CANCELLED.value,
+            cancel_requested=True,
+            finished_at=datetime.utcnow(),
+        )
+        .returning(Job)
+    )
+    if job is None:
+        job = db.scalar(
+            update(Job)
+            .where(Job.id == job_id, Job.status == JobStatus.RUNNING.value)
+            .values(cancel_requested=True)
+            .returning(Job)
+        )
+    if job is None:
+        # Finished jobs are left unchanged
+        job = get_job(job_id, db=db)
+    db.commit()
+    return job
+
+
+def fail_interrupted_jobs():
+    """Mark the queued or running jobs of dead processes as failed.
+
+    Jobs run inside the application process, so they do not survive a restart.
+    A job is only failed once its heartbeat is older than `JOB_STALE_AFTER`, the
+    jobs of the other live workers keep running.
+    """
+    stale_before = datetime.utcnow() - timedelta(seconds=settings.JOB_STALE_AFTER)
+    with SessionLocal() as session:
+        interrupted = session.execute(
+            update(Job)
+            .where(
+                Job.status.in_(ACTIVE_STATUSES),
+                (Job.heartbeat_at < stale_before) | Job.heartbeat_at.is_(None),
+            )
+            .values(
+                status=JobStatus.FAILED.value,
+                error="Interrupted, the process running it stopped",
+                finished_at=datetime.utcnow(),
+            )
+        ).rowcount
+        session.commit()
+
+    if interrupted:
+        logger.warning("Marked %d interrupted jobs as failed", interrupted)
@@ -0,0 +1,172 @@
+from fastapi import Depends, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from config import settings
+from database import get_async_db
+from pagination import keyset, build_page
+from responses import page_response
+from conditional import (
+    check_conditional,
+    collection_state,
+    collection_validators,
+    item_validators,
+)
+from src.task.models import Task
+from src.task.routers import router
+from src.task.schemas import (
+    TaskCreatePayloadSchema,
+    TaskUpdatePayloadSchema,
+    TaskResponseSchema,
+    TaskPageResponseSchema,
+    task_page_adapter,
+    TaskSort,
+)
+from src.task.services import (
+    get_task_by_id_async,
+    get_task_filters,
+    update_task_by_id_async,
+)
+from src.user.services import get_user_by_id_async
+
+# Async counterparts of the handlers in src/task/routers.py. Importing this module
+# replaces the sync routes on the shared router, see router.py.
+
+
+@router.get("", response_model=TaskPageResponseSchema)
+async def get_tasks(
+    request: Request,
+    response: Response,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    sort: TaskSort = TaskSort.ID,
+    filters: list = Depends(get_task_filters),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Retrieve one page of tasks, filtered and sorted.
+
+    Args:
+        request (Request): Incoming request, read for conditional headers.
+        response (Response): Response, receives the ETag and Last-Modified headers.
+        limit (int, optional): Maximum number of tasks in the page.
+        after (str, optional): Cursor returned as `next_cursor` by the previous page.
+        sort (TaskSort, optional): Sort order, a leading "-" means descending. Defaults to id.
+        filters (list, optional): Criteria built by `get_task_filters` from the
+            assign_to, category and created/updated time range query parameters.
+        db (AsyncSession, optional): Async database session object. Defaults to Depends(get_async_db).
+
+    Returns:
+        TaskPageResponseSchema: Tasks of the page and the cursor of the next page,
+            or an empty 304 response if the client copy is still fresh.
+    """
+    # Answer with 304 if the collection did not change since the client fetched it
+    state = (await db.execute(collection_state(Task))).one()
+    etag, last_modified = collection_validators(state, request.url.query)
+    not_modified = check_conditional(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+
+    # Get the columns of the matching Task records that follow the cursor
+    statement = keyset(
+        select(*Task.__table__.c).where(*filters),
+        Task.id,
+        limit=limit,
+        after=after,
+        sort_column=getattr(Task, sort.field),
+        descending=sort.descending,
+    )
+    rows = (await db.execute(statement)).all()
+    tasks, next_cursor = build_page(rows, limit, sort_key=sort.field)
+
+    # Validate and encode the whole page at once, based on the response schema
+    return page_response(task_page_adapter, tasks, next_cursor, response)
+
+
+@router.get("/{task_id}", response_model=TaskResponseSchema)
+async def get_task(
+    task_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get a task by id.
+
+    Args:
+        task_id (int): ID of the task to get.
+        request (Request): Incoming request, read for conditional headers.
+        response (Response): Response, receives the ETag and Last-Modified headers.
+        db (AsyncSession, optional): Async database session object. Defaults to Depends(get_async_db).
+
+    Returns:
+        TaskResponseSchema: The task object, or an empty 304 response if the
+            client copy is still fresh.
+    """
+    task = await get_task_by_id_async(task_id=task_id, db=db)
+
+    # Answer with 304 if the task did not change since the client fetched it
+    etag, last_modified = item_validators(task)
+    not_modified = check_conditional(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+
+    return TaskResponseSchema.from_orm(task)
+
+
+@router.post("", response_model=TaskResponseSchema)
+async def create_task(
+    payload: TaskCreatePayloadSchema, db: AsyncSession = Depends(get_async_db)
+):
+    """Create a new task.
+
+    Args:
+        payload (TaskCreatePayloadSchema): Task details needed to create a new task record.
+        db (AsyncSession, optional): Async database session object. Defaults to Depends(get_async_db).
+
+    Returns:
+        TaskResponseSchema: Newly created task object.
+    """
+    user = await get_user_by_id_async(user_id=payload.assign_to, db=db)
+
+    new_task = Task(
+        title=payload.title,
+        category=payload.category,
+        assign_to=user.id if user else None,
+    )
+
+    # Add the task object to the database
+    db.add(new_task)
+    # Commit the changes to the database
+    await db.commit()
+
+    # Return the task object based on the response schema
+    return TaskResponseSchema.from_orm(new_task)
+
+
+@router.patch("/{task_id}", response_model=TaskResponseSchema)
+async def update_task(
+    task_id: int,
+    payload: TaskUpdatePayloadSchema,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Update a task object.
+
+    Args:
+        task_id (int): ID of the task to update.
+        payload (TaskUpdatePayloadSchema): Data to update the task with.
+        db (AsyncSession, optional): Async database session object. Defaults to Depends(get_async_db).
+
+    Returns:
+        TaskResponseSchema: Updated task object.
+    """
+    # Columns to update, the version is only used to detect conflicts
+    update_data = payload.dict(exclude_unset=True)
+    version = update_data.pop("version", None)
+
+    # Update the task in one statement, then commit the changes to the database
+    task = await update_task_by_id_async(
+        task_id=task_id, values=update_data, db=db, version=version
+    )
+    await db.commit()
+
+    # Return the updated task object based on the response schema
+    return TaskResponseSchema.from_orm(task)
@@ -0,0 +1,214 @@
+import asyncio
+import json
+from typing import NamedTuple, Optional
+from fastapi import WebSocket
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from pubsub import PubSub, Subscription
+from src.task.models import Task, TaskCategory
+from src.task.schemas import TaskResponseSchema
+from config import settings
+
+# Key of the session.info entry holding the events to publish after commit
+_PENDING_EVENTS = "task_feed_events"
+
+# Close code sent to WebSocket subscribers that were dropped (try again later)
+DROPPED_CLOSE_CODE = 1013
+
+
+class TaskEvent(NamedTuple):
+    """
+    A change of the tasks table, with its JSON encoding shared by the subscribers.
+    """
+
+    data: dict
+    encoded: str
+
+
+# Change feed of the tasks, fed by the task writes and read by the feed endpoints
+task_feed = PubSub(maxsize=settings.FEED_QUEUE_SIZE)
+
+
+def _make_event(**data):
+    return TaskEvent(data, json.dumps(data))
+
+
+def created_event(task):
+    """Build the event of a created task, from an instance or a row."""
+    return _make_event(
+        type="created",
+        id=task.id,
+        assign_to=task.assign_to,
+        category=task.category,
+        task=TaskResponseSchema.from_orm(task).model_dump(mode="json"),
+    )
+
+
+def updated_event(task, previous_assign_to, previous_category):
+    """Build the event of an updated task, with its assignee and category before."""
+    return _make_event(
+        type="updated",
+        id=task.id,
+        assign_to=task.assign_to,
+        category=task.category,
+        previous_assign_to=previous_assign_to,
+        previous_category=previous_category,
+        task=TaskResponseSchema.from_orm(task).model_dump(mode="json"),
+    )
+
+
+def deleted_event(ids: list, assign_to, category):
+    """Build the event of deleted tasks sharing an assignee and a category."""
+    return _make_event(type="deleted", ids=ids, assign_to=assign_to, category=category)
+
+
+def reassigned_event(
+    ids: list, assign_to, category, previous_assign_to, previous_category
+):
+    """Build the event of tasks moved together by a batch reassignment."""
+    return _make_event(
+        type="reassigned",
+        ids=ids,
+        assign_to=assign_to,
+        category=category,
+        previous_assign_to=previous_assign_to,
+        previous_category=previous_category,
+    )
+
+
+def queue_task_event(session: Session, task_event: TaskEvent):
+    """Publish an event once the session commits, drop it if it rolls back.
+
+    Args:
+        session (Session): Session writing the change.
+        task_event (TaskEvent): Event describing the change.
+    """
+    session.info.setdefault(_PENDING_EVENTS, []).append(task_event)
+
+
+def task_event_filter(
+    assign_to: Optional[int] = None, category: Optional[TaskCategory] = None
+):
+    """Build the predicate selecting the events of an assignee and/or a category.
+
+    An update matches if the task matched before or after it, so subscribers see
+    tasks leaving their selection.
+
+    Args:
+        assign_to (int, optional): Only events of tasks assigned to this user.
+        category (TaskCategory, optional): Only events of tasks of this category.
+
+    Returns:
+        Callable | None: The predicate, or None to receive every event.
+    """
+    if assign_to is None and category is None:
+        return None
+
+    def predicate(task_event: TaskEvent):
+        data = task_event.data
+        if assign_to is not None and assign_to not in (
+            data["assign_to"],
+            data.get("previous_assign_to"),
+        ):
+            return False
+        if category is not None and category.value not in (
+            data["category"],
+            data.get("previous_category"),
+        ):
+            return False
+        return True
+
+    return predicate
+
+
+async def sse_stream(subscription: Subscription):
+    """Format the events of a subscription as Server-Sent Events.
+
+    A comment is sent when no event came for `FEED_HEARTBEAT` seconds, so proxies
+    keep the connection open, and a `dropped` event ends the stream of a subscriber
+    that fell behind.
+    """
+    try:
+        while True:
+            try:
+                task_event = await asyncio.wait_for(
+                    subscription.__anext__(), settings.FEED_HEARTBEAT
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            except StopAsyncIteration:
+                yield "event: dropped\ndata: {}\n\n"
+                return
+            yield f"event: {task_event.data['type']}\ndata: {task_event.encoded}\n\n"
+    finally:
+        task_feed.unsubscribe(subscription)
+
+
+async def websocket_stream(websocket: WebSocket, subscription: Subscription):
+    """Send the events of a subscription over a WebSocket until either side stops.
+
+    Args:
+        websocket (WebSocket): Accepted WebSocket connection.
+        subscription (Subscription): Subscription of the connection.
+    """
+
+    async def send_events():
+        async for task_event in subscription:
+            await websocket.send_text(task_event.encoded)
+        await websocket.close(code=DROPPED_CLOSE_CODE)
+
+    async def wait_disconnect():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    tasks = {asyncio.create_task(send_events()), asyncio.create_task(wait_disconnect())}
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        task_feed.unsubscribe(subscription)
+        for task in tasks:
+            task.cancel()
+
+
+@event.listens_for(Task, "after_insert")
+def _queue_created_event(mapper, connection, target):
+    queue_task_event(Session.object_session(target), created_event(target))
+
+
+@event.listens_for(Task, "after_update")
+def _queue_updated_event(mapper, connection, target):
+    state = inspect(target)
+    previous = {}
+    changed = False
+    for attr in mapper.column_attrs:
+        history = state.attrs[attr.key].history
+        changed = changed or history.has_changes()
+        previous[attr.key] = (
+            history.deleted[0] if history.deleted else getattr(target, attr.key)
+        )
+    # The ORM calls after_update for every dirty instance, even without changes
+    if changed:
+        queue_task_event(
+            Session.object_session(target),
+            updated_event(target, previous["assign_to"], previous["category"]),
+        )
+
+
+@event.listens_for(Task, "after_delete")
+def _queue_deleted_event(mapper, connection, target):
+    queue_task_event(
+        Session.object_session(target),
+        deleted_event([target.id], target.assign_to, target.category),
+    )
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session):
+    for task_event in session.info.pop(_PENDING_EVENTS, ()):
+        task_feed.publish(task_event)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(_PENDING_EVENTS, None)
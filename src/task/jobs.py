@@ -0,0 +1,92 @@
+from sqlalchemy import func, select
+from database import SessionLocal
+from src.job.schemas import JobNoParamsSchema
+from src.job.services import JobContext, register_job_kind
+from src.task.models import Task
+from src.task.schemas import TaskDeleteJobParamsSchema, TaskReassignPayloadSchema
+from src.task.search import rebuild_task_search
+from src.task.services import (
+    delete_tasks_in_chunks,
+    get_task_filters,
+    get_task_reassignment,
+    reassign_tasks_in_chunks,
+    rebuild_task_stats,
+)
+
+
+@register_job_kind("delete-tasks", TaskDeleteJobParamsSchema)
+def delete_tasks_job(job: JobContext, params: TaskDeleteJobParamsSchema):
+    """Delete the tasks matching the filters, in committed chunks
+
+    Args:
+        job (JobContext): Running job, progress is the number of deleted tasks.
+        params (TaskDeleteJobParamsSchema): Filters of the tasks to delete.
+
+    Returns:
+        dict: Number of deleted tasks and chunks.
+    """
+    criteria = get_task_filters(**dict(params))
+    with SessionLocal() as session:
+        total = session.execute(select(func.count(Task.id)).where(*criteria)).scalar()
+    job.report(0, total)
+
+    deleted, chunks = delete_tasks_in_chunks(criteria, on_chunk=job.report)
+    return {"deleted": deleted, "chunks": chunks}
+
+
+@register_job_kind("reassign-tasks", TaskReassignPayloadSchema)
+def reassign_tasks_job(job: JobContext, params: TaskReassignPayloadSchema):
+    """Reassign and/or recategorize tasks, in committed chunks
+
+    Args:
+        job (JobContext): Running job, progress is the number of changed tasks.
+        params (TaskReassignPayloadSchema): Tasks to change and their new values.
+
+    Returns:
+        dict: Number of changed tasks and chunks.
+    """
+    with SessionLocal() as session:
+        criteria, values = get_task_reassignment(params, db=session)
+        total = session.execute(select(func.count(Task.id)).where(*criteria)).scalar()
+    job.report(0, total)
+
+    updated, chunks = reassign_tasks_in_chunks(criteria, values, on_chunk=job.report)
+    return {"updated": updated, "chunks": chunks}
+
+
+@register_job_kind("rebuild-task-stats", JobNoParamsSchema)
+def rebuild_task_stats_job(job: JobContext, params: JobNoParamsSchema):
+    """Recompute the task_stats aggregate table from the tasks table
+
+    Args:
+        job (JobContext): Running job.
+        params (JobNoParamsSchema): No params.
+
+    Returns:
+        dict: Empty result.
+    """
+    job.report(0, 1)
+    with SessionLocal() as session:
+        rebuild_task_stats(session.connection())
+        session.commit()
+    job.report(1)
+    return {}
+
+
+@register_job_kind("rebuild-task-search", JobNoParamsSchema)
+def rebuild_task_search_job(job: JobContext, params: JobNoParamsSchema):
+    """Rebuild the tasks_fts search index from the tasks table
+
+    Args:
+        job (JobContext): Running job.
+        params (JobNoParamsSchema): No params.
+
+    Returns:
+        dict: Empty result.
+    """
+    job.report(0, 1)
+    with SessionLocal() as session:
+        rebuild_task_search(session.connection())
+        session.commit()
+    job.report(1)
+    return {}
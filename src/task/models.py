@@ -1,5 +1,7 @@
+from conditional import track_collection
 from database import Base
-from sqlalchemy import Column, Integer, DateTime, String, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, DateTime, String, Boolean, ForeignKey, Index
+from sqlalchemy import DDL, event
 from datetime import datetime
 from enum import Enum
 
@@ -23,11 +25,69 @@ class Task(Base):
     """
 
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Indexes backing the filters and sort orders of GET /tasks
+        Index(
+            "ix_tasks_assign_to_category_created_at",
+            "assign_to",
+            "category",
+            "created_at",
+        ),
+        Index("ix_tasks_assign_to_updated_at", "assign_to", "updated_at"),
+        Index("ix_tasks_category_created_at", "category", "created_at"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     category = Column(String)
+    # Looked up through the (assign_to, ...) indexes above
     assign_to = Column(
         Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True
     )
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    updated_at = Column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True
+    )
+    # Incremented by every update, PATCH requests can send it to detect conflicts
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+
+# FTS5 index of the task titles. It is an external content table: titles are
+# stored once, in `tasks`, and the triggers keep the index in sync with it.
+TASK_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts "
+    "USING fts5(title, content='tasks', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts (rowid, title) VALUES (new.id, new.title); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts (tasks_fts, rowid, title) "
+    "VALUES ('delete', old.id, old.title); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title ON tasks "
+    "BEGIN INSERT INTO tasks_fts (tasks_fts, rowid, title) "
+    "VALUES ('delete', old.id, old.title); "
+    "INSERT INTO tasks_fts (rowid, title) VALUES (new.id, new.title); END",
+)
+
+# Create the search index with the tasks table when the schema is built with
+# create_all, migrations create it explicitly
+for _statement in TASK_SEARCH_DDL:
+    event.listen(
+        Task.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite")
+    )
+
+# Bump the version of the tasks collection on every write, for the ETag of GET /tasks
+track_collection(Task)
+
+
+class TaskStat(Base):
+    """
+    Represents the number of tasks of one category assigned to one user.
+
+    Maintained in the same transaction as the task writes, see src/task/services.py.
+    """
+
+    __tablename__ = "task_stats"
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    category = Column(String, primary_key=True)
+    task_count = Column(Integer, nullable=False, default=0)
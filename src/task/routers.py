@@ -4,16 +4,63 @@ from src.task.schemas import (
     TaskCreatePayloadSchema,
     TaskUpdatePayloadSchema,
     TaskResponseSchema,
-    MessageSchema,
+    TaskPageResponseSchema,
+    task_page_adapter,
+    TaskSort,
+    TaskUserStatsSchema,
+    TaskBulkItemResultSchema,
+    TaskBulkResponseSchema,
+    TaskDeleteResponseSchema,
+    TaskReassignPayloadSchema,
+    TaskReassignResponseSchema,
 )
-from database import get_db
-from src.task.models import Task
-from fastapi import Depends
+from database import get_db, get_read_db
+from src.task.models import Task, TaskCategory
+from fastapi import (
+    BackgroundTasks,
+    Depends,
+    Query,
+    HTTPException,
+    Request,
+    Response,
+    WebSocket,
+)
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
-from src.task.services import get_task_by_id
-from src.user.services import get_user_by_id
+from typing import List, Optional
+from src.task.services import (
+    get_task_by_id,
+    get_task_filters,
+    get_task_stats,
+    apply_task_stat_deltas,
+    delete_tasks_in_chunks,
+    get_task_reassignment,
+    reassign_tasks_in_chunks,
+    update_task_by_id,
+)
+from src.task.search import search_tasks_query
+from src.task.feed import (
+    created_event,
+    queue_task_event,
+    sse_stream,
+    task_event_filter,
+    task_feed,
+    websocket_stream,
+)
+from collections import Counter
+from src.user.services import get_user_by_id, get_existing_user_ids
 from src.user.models import User
+from pagination import keyset, build_page
+from responses import page_response
+from conditional import (
+    check_conditional,
+    collection_state,
+    collection_validators,
+    item_validators,
+)
+from exports import ExportFormat, export_response
+from sqlalchemy import select, insert
+from config import settings
 
 # Create the router using SQLAlchemyCRUDRouter from fastapi_crudrouter
 router = SQLAlchemyCRUDRouter(
@@ -27,28 +74,223 @@ router = SQLAlchemyCRUDRouter(
     create_route=False,
     update_route=False,
     delete_one_route=True,
-    delete_all_route=True,
+    delete_all_route=False,
     tags=["Task"],
     prefix="/tasks",
 )
 
 
-@router.get("", response_model=List[TaskResponseSchema])
-def get_tasks(db: Session = Depends(get_db)):
-    """Retrieve all tasks from the database.
+@router.get("", response_model=TaskPageResponseSchema)
+def get_tasks(
+    request: Request,
+    response: Response,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    sort: TaskSort = TaskSort.ID,
+    filters: list = Depends(get_task_filters),
+    db: Session = Depends(get_read_db),
+):
+    """Retrieve one page of tasks, filtered and sorted.
 
     Args:
-        db (Session, optional): Database session object. Defaults to Depends(get_db).
+        request (Request): Incoming request, read for conditional headers.
+        response (Response): Response, receives the ETag and Last-Modified headers.
+        limit (int, optional): Maximum number of tasks in the page.
+        after (str, optional): Cursor returned as `next_cursor` by the previous page.
+        sort (TaskSort, optional): Sort order, a leading "-" means descending. Defaults to id.
+        filters (list, optional): Criteria built by `get_task_filters` from the
+            assign_to, category and created/updated time range query parameters.
+        db (Session, optional): Database session object. Defaults to Depends(get_read_db).
+
+    Returns:
+        TaskPageResponseSchema: Tasks of the page and the cursor of the next page,
+            or an empty 304 response if the client copy is still fresh.
+    """
+    # Answer with 304 if the collection did not change since the client fetched it
+    state = db.execute(collection_state(Task)).one()
+    etag, last_modified = collection_validators(state, request.url.query)
+    not_modified = check_conditional(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+
+    # Get the columns of the matching Task records that follow the cursor
+    statement = keyset(
+        select(*Task.__table__.c).where(*filters),
+        Task.id,
+        limit=limit,
+        after=after,
+        sort_column=getattr(Task, sort.field),
+        descending=sort.descending,
+    )
+    rows = db.execute(statement).all()
+    tasks, next_cursor = build_page(rows, limit, sort_key=sort.field)
+
+    # Validate and encode the whole page at once, based on the response schema
+    return page_response(task_page_adapter, tasks, next_cursor, response)
+
+
+@router.get("/export")
+def export_tasks(format: ExportFormat = ExportFormat.NDJSON):
+    """Stream every task as NDJSON or CSV.
+
+    Args:
+        format (ExportFormat, optional): Output format. Defaults to NDJSON.
+
+    Returns:
+        StreamingResponse: Tasks streamed in chunks, ordered by id.
+    """
+    columns = [
+        Task.id,
+        Task.title,
+        Task.category,
+        Task.assign_to,
+        Task.created_at,
+        Task.updated_at,
+    ]
+    statement = select(*columns).order_by(Task.id)
+    return export_response(statement, columns, format, name="tasks")
+
+
+@router.get("/stats", response_model=List[TaskUserStatsSchema])
+def get_stats(user_id: Optional[int] = None, db: Session = Depends(get_read_db)):
+    """Get the number of tasks assigned to each user, in total and per category.
+
+    Reads the task_stats aggregate table, so the cost depends on the number of
+    users and not on the number of tasks.
+
+    Args:
+        user_id (int, optional): Only return the counts of this user.
+        db (Session, optional): Database session object. Defaults to Depends(get_read_db).
+
+    Returns:
+        List of TaskUserStatsSchema: Task counts of each user with assigned tasks.
+    """
+    stats = {}
+    for row in get_task_stats(db=db, user_id=user_id):
+        entry = stats.setdefault(
+            row.user_id,
+            TaskUserStatsSchema(user_id=row.user_id, total=0, by_category={}),
+        )
+        entry.by_category[row.category] = row.task_count
+        entry.total += row.task_count
+
+    return list(stats.values())
+
+
+@router.get("/search", response_model=TaskPageResponseSchema)
+def search_tasks(
+    response: Response,
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    filters: list = Depends(get_task_filters),
+    db: Session = Depends(get_read_db),
+):
+    """Search tasks by the words of their title, best matches first.
+
+    Uses the tasks_fts full text index instead of scanning titles with LIKE.
+
+    Args:
+        response (Response): Response, its headers are sent with the page.
+        q (str): Words to search for, a task matches if its title holds all of them.
+        limit (int, optional): Maximum number of tasks in the page.
+        after (str, optional): Cursor returned as `next_cursor` by the previous page.
+        filters (list, optional): Criteria built by `get_task_filters`.
+        db (Session, optional): Database session object. Defaults to Depends(get_read_db).
+
+    Returns:
+        TaskPageResponseSchema: Tasks of the page, ordered by bm25 rank then id, and
+            the cursor of the next page.
+    """
+    # Page over the (rank, id) keyset of the matching tasks
+    matches = search_tasks_query(q, *filters)
+    statement = keyset(
+        select(matches),
+        matches.c.id,
+        limit=limit,
+        after=after,
+        sort_column=matches.c.rank,
+    )
+    rows = db.execute(statement).all()
+    tasks, next_cursor = build_page(rows, limit, sort_key="rank")
+
+    return page_response(task_page_adapter, tasks, next_cursor, response)
+
+
+@router.get("/feed")
+async def get_task_feed(
+    assign_to: Optional[int] = None, category: Optional[TaskCategory] = None
+):
+    """Stream task changes as Server-Sent Events, instead of polling GET /tasks.
+
+    Each event is named after its type (created, updated, reassigned or deleted)
+    and holds a JSON object. Clients that fall `FEED_QUEUE_SIZE` events behind receive a
+    `dropped` event and are disconnected.
+
+    Args:
+        assign_to (int, optional): Only changes of tasks assigned to this user.
+        category (TaskCategory, optional): Only changes of tasks of this category.
 
     Returns:
-        List of TaskResponseSchema: List of task objects.
+        StreamingResponse: The text/event-stream response.
+    """
+    subscription = task_feed.subscribe(task_event_filter(assign_to, category))
+    return StreamingResponse(
+        sse_stream(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@router.websocket("/feed/ws")
+async def task_feed_websocket(
+    websocket: WebSocket,
+    assign_to: Optional[int] = None,
+    category: Optional[TaskCategory] = None,
+):
+    """Stream task changes over a WebSocket, one JSON text message per change.
+
+    Clients that fall `FEED_QUEUE_SIZE` events behind are disconnected with the
+    close code 1013 (try again later).
+
+    Args:
+        websocket (WebSocket): Incoming WebSocket connection.
+        assign_to (int, optional): Only changes of tasks assigned to this user.
+        category (TaskCategory, optional): Only changes of tasks of this category.
     """
+    await websocket.accept()
+    subscription = task_feed.subscribe(task_event_filter(assign_to, category))
+    await websocket_stream(websocket, subscription)
 
-    # Get all Task records from the database
-    all_tasks = db.query(Task).all()
 
-    # Iterate through all tasks and return them based on the response schema
-    return [TaskResponseSchema(**(vars(task))) for task in all_tasks]
+@router.get("/{task_id}", response_model=TaskResponseSchema)
+def get_task(
+    task_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+):
+    """Get a task by id.
+
+    Args:
+        task_id (int): ID of the task to get.
+        request (Request): Incoming request, read for conditional headers.
+        response (Response): Response, receives the ETag and Last-Modified headers.
+        db (Session, optional): Database session object. Defaults to Depends(get_read_db).
+
+    Returns:
+        TaskResponseSchema: The task object, or an empty 304 response if the
+            client copy is still fresh.
+    """
+    task = get_task_by_id(task_id=task_id, db=db)
+
+    # Answer with 304 if the task did not change since the client fetched it
+    etag, last_modified = item_validators(task)
+    not_modified = check_conditional(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+
+    return TaskResponseSchema.from_orm(task)
 
 
 @router.post("", response_model=TaskResponseSchema)
@@ -79,6 +321,141 @@ def create_task(payload: TaskCreatePayloadSchema, db: Session = Depends(get_db))
     return TaskResponseSchema.from_orm(new_task)
 
 
+@router.post("/bulk", response_model=TaskBulkResponseSchema)
+def create_tasks_bulk(
+    payload: List[TaskCreatePayloadSchema], db: Session = Depends(get_db)
+):
+    """Create many tasks in one transaction.
+
+    All assignees are checked with one query and the valid tasks are inserted with
+    one multi-row INSERT. Tasks assigned to an unknown user are skipped and reported.
+
+    Args:
+        payload (List[TaskCreatePayloadSchema]): Details of the tasks to create.
+        db (Session, optional): Database session object. Defaults to Depends(get_db).
+
+    Raises:
+        HTTPException: If the payload has more than `MAX_BULK_SIZE` items.
+
+    Returns:
+        TaskBulkResponseSchema: Created task or error for each item, in payload order.
+    """
+    if len(payload) > settings.MAX_BULK_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.MAX_BULK_SIZE} tasks can be created at once",
+        )
+
+    # Check every assignee with a single IN query
+    existing_user_ids = get_existing_user_ids(
+        (item.assign_to for item in payload if item.assign_to), db=db
+    )
+
+    results = []
+    rows = []
+    for index, item in enumerate(payload):
+        if item.assign_to and item.assign_to not in existing_user_ids:
+            results.append(
+                TaskBulkItemResultSchema(
+                    index=index,
+                    error=f"User id: {item.assign_to} not exist in database",
+                )
+            )
+            continue
+
+        results.append(TaskBulkItemResultSchema(index=index))
+        rows.append(
+            dict(title=item.title, category=item.category, assign_to=item.assign_to)
+        )
+
+    if rows:
+        # Insert all valid tasks with one multi-row INSERT. A Core insert is used
+        # so rows without an assignee stay in the same batch.
+        tasks_table = Task.__table__
+        new_tasks = db.execute(
+            insert(tasks_table).returning(*tasks_table.c), rows
+        ).all()
+
+        # Core inserts skip the ORM events, so update the task counts here
+        apply_task_stat_deltas(
+            db.connection(),
+            Counter((row["assign_to"], row["category"]) for row in rows),
+        )
+
+        # RETURNING order is not guaranteed, but ids are assigned in VALUES order,
+        # so sorting by id puts the created tasks back in payload order
+        new_tasks.sort(key=lambda task: task.id)
+        created = iter(new_tasks)
+        for result in results:
+            if result.error is None:
+                result.task = TaskResponseSchema.from_orm(next(created))
+
+        # Publish the created tasks on the change feed once committed
+        for task in new_tasks:
+            queue_task_event(db, created_event(task))
+
+        # Commit the changes to the database once
+        db.commit()
+
+    return TaskBulkResponseSchema(created=len(rows), results=results)
+
+
+@router.delete("", response_model=TaskDeleteResponseSchema)
+def delete_tasks(
+    response: Response,
+    background_tasks: BackgroundTasks,
+    background: bool = False,
+    filters: list = Depends(get_task_filters),
+):
+    """Delete the tasks matching the filters, every task if there is none.
+
+    Tasks are deleted in chunks of `DELETE_CHUNK_SIZE`, each in its own transaction,
+    so other writers are not locked out for the whole deletion.
+
+    Args:
+        response (Response): Response, its status is 202 for a background deletion.
+        background_tasks (BackgroundTasks): Runs the deletion after the response.
+        background (bool, optional): Return at once and delete in the background.
+            Defaults to False.
+        filters (list, optional): Criteria built by `get_task_filters` from the
+            assign_to, category and created/updated time range (age) parameters.
+
+    Returns:
+        TaskDeleteResponseSchema: Number of deleted tasks and chunks, or only the
+            status of a background deletion.
+    """
+    if background:
+        background_tasks.add_task(delete_tasks_in_chunks, filters)
+        response.status_code = 202
+        return TaskDeleteResponseSchema(status="scheduled")
+
+    deleted, chunks = delete_tasks_in_chunks(filters)
+    return TaskDeleteResponseSchema(status="completed", deleted=deleted, chunks=chunks)
+
+
+@router.post("/reassign", response_model=TaskReassignResponseSchema)
+def reassign_tasks(
+    payload: TaskReassignPayloadSchema, db: Session = Depends(get_read_db)
+):
+    """Reassign and/or recategorize many tasks at once, e.g. when offboarding a user.
+
+    The tasks are changed by set-based UPDATEs of `REASSIGN_CHUNK_SIZE` tasks, each
+    in its own transaction. Tasks that already have the new values are skipped.
+
+    Args:
+        payload (TaskReassignPayloadSchema): Ids or filter of the tasks, and their
+            new assign_to and/or category.
+        db (Session, optional): Database session object, only reads the new
+            assignee. Defaults to Depends(get_read_db).
+
+    Returns:
+        TaskReassignResponseSchema: Number of changed tasks and chunks.
+    """
+    criteria, values = get_task_reassignment(payload, db=db)
+    updated, chunks = reassign_tasks_in_chunks(criteria, values)
+    return TaskReassignResponseSchema(updated=updated, chunks=chunks)
+
+
 @router.patch("/{task_id}", response_model=TaskResponseSchema)
 def update_task(
     task_id: int, payload: TaskUpdatePayloadSchema, db: Session = Depends(get_db)
@@ -93,29 +470,15 @@ def update_task(
     Returns:
         TaskResponseSchema: Updated task object.
     """
-    print(payload.assign_to)
-    # Get the task object based on the provided task_id
-    task = get_task_by_id(task_id=task_id, db=db)
-    user = get_user_by_id(user_id=payload.assign_to, db=db)
+    # Columns to update, the version is only used to detect conflicts
+    update_data = payload.dict(exclude_unset=True)
+    version = update_data.pop("version", None)
 
-    if task:
-        # Convert the payload to a dictionary and exclude unset values
-        update_data = payload.dict(exclude_unset=True)
-
-        # Iterate through the dictionary items
-        for field, value in update_data.items():
-            # Update the fields in the task object
-            setattr(task, field, value)
-
-        # Add the updated task object to the database
-        db.add(task)
-        # Commit the changes to the database
-        db.commit()
-        # Refresh and reflect the changes
-        db.refresh(task)
-
-        # Return the updated task object based on the response schema
-        return TaskResponseSchema.from_orm(task)
+    # Update the task in one statement, then commit the changes to the database
+    task = update_task_by_id(
+        task_id=task_id, values=update_data, db=db, version=version
+    )
+    db.commit()
 
-    # Return an error message if the task_id doesn't exist in the database
-    return MessageSchema(message=f"task_id: {task_id} does not exist in the database")
+    # Return the updated task object based on the response schema
+    return TaskResponseSchema.from_orm(task)
@@ -1,12 +1,39 @@
-from pydantic import BaseModel, validator, conint
+from pydantic import BaseModel, TypeAdapter, validator, conint
 from datetime import datetime
-from typing import Optional, Union
+from typing import Dict, List, Optional, Union
 from src.task.models import TaskCategory
+from enum import Enum
+from pagination import PageSchema
 
 
-class TaskBaseSchema(BaseModel):
+class TaskSort(str, Enum):
     """
-    Represents the base schema for a task.
+    Represents the sort orders of the task list, a leading "-" means descending.
+
+    Inherits from the `str` class and the `Enum` class.
+    """
+
+    ID = "id"
+    ID_DESC = "-id"
+    CREATED_AT = "created_at"
+    CREATED_AT_DESC = "-created_at"
+    UPDATED_AT = "updated_at"
+    UPDATED_AT_DESC = "-updated_at"
+
+    @property
+    def field(self):
+        """Name of the sorted column."""
+        return self.value.lstrip("-")
+
+    @property
+    def descending(self):
+        """Whether the order is descending."""
+        return self.value.startswith("-")
+
+
+class TaskFieldsSchema(BaseModel):
+    """
+    Represents the fields of a task, without input validation.
     """
 
     title: str
@@ -21,6 +48,13 @@ class TaskBaseSchema(BaseModel):
         # Enable automatic conversion from attributes to dict during model initialization
         from_attributes = True
 
+
+class TaskBaseSchema(TaskFieldsSchema):
+    """
+    Represents the base schema for a task.
+    Inherits from TaskFieldsSchema and validates the input fields.
+    """
+
     @validator("category")
     def validate_category(cls, value):
         """
@@ -54,15 +88,132 @@ class TaskCreatePayloadSchema(TaskBaseSchema):
     pass
 
 
-class TaskResponseSchema(TaskBaseSchema):
+class TaskResponseSchema(TaskFieldsSchema):
     """
     Represents the schema for a task response.
-    Inherits from TaskBaseSchema.
+    Inherits from TaskFieldsSchema, the data comes from the database and was
+    validated when it was written.
     """
 
     id: int
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
+    version: Optional[int] = None
+
+
+class TaskPageResponseSchema(PageSchema[TaskResponseSchema]):
+    """
+    Represents one page of tasks.
+    """
+
+    pass
+
+
+# Validates and serializes a whole page of task rows in one call each
+task_page_adapter = TypeAdapter(TaskPageResponseSchema)
+
+
+class TaskBulkItemResultSchema(BaseModel):
+    """
+    Represents the result of one item of a bulk task creation.
+    """
+
+    index: int
+    task: Optional[TaskResponseSchema] = None
+    error: Optional[str] = None
+
+
+class TaskBulkResponseSchema(BaseModel):
+    """
+    Represents the response of a bulk task creation.
+    """
+
+    created: int
+    results: List[TaskBulkItemResultSchema]
+
+
+class TaskDeleteResponseSchema(BaseModel):
+    """
+    Represents the response of a bulk task deletion.
+    """
+
+    status: str
+    deleted: Optional[int] = None
+    chunks: Optional[int] = None
+
+
+class TaskFilterSchema(BaseModel):
+    """
+    Represents the filters of the task list, see `get_task_filters`.
+    """
+
+    assign_to: Optional[int] = None
+    category: Optional[TaskCategory] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    updated_after: Optional[datetime] = None
+    updated_before: Optional[datetime] = None
+
+
+class TaskDeleteJobParamsSchema(TaskFilterSchema):
+    """
+    Represents the params of a delete-tasks job, the filters of the tasks to delete.
+    """
+
+    pass
+
+
+class TaskReassignPayloadSchema(BaseModel):
+    """
+    Represents the schema for reassigning or recategorizing many tasks at once.
+
+    The tasks are given by `ids` or by `filter`. Only the fields that are set are
+    changed, a null `assign_to` unassigns the tasks. Tasks always have a category,
+    it can not be set to null.
+    """
+
+    ids: Optional[List[conint(ge=1)]] = None
+    filter: Optional[TaskFilterSchema] = None
+    assign_to: Optional[conint(ge=1)] = None
+    category: Optional[TaskCategory] = None
+
+    @validator("category")
+    def validate_category(cls, value):
+        """
+        Validator for the 'category' field, rejects an explicit null.
+
+        Args:
+            cls (Type[TaskReassignPayloadSchema]): The class being validated.
+            value (Any): The value of the 'category' field being validated.
+
+        Returns:
+            TaskCategory: The validated category.
+
+        Raises:
+            ValueError: If the category is null.
+        """
+        if value is None:
+            raise ValueError("Category can not be null, leave it out to keep it")
+        return value
+
+
+class TaskReassignResponseSchema(BaseModel):
+    """
+    Represents the response of a batch reassignment.
+    """
+
+    updated: int
+    chunks: int
+
+
+class TaskUserStatsSchema(BaseModel):
+    """
+    Represents the task counts of one user.
+    """
+
+    user_id: int
+    total: int
+    by_category: Dict[str, int]
 
 
 class TaskUpdatePayloadSchema(BaseModel):
@@ -73,6 +224,8 @@ class TaskUpdatePayloadSchema(BaseModel):
     title: Optional[str] = None
     category: Optional[str] = None
     assign_to: Optional[conint(ge=1)] = None
+    # Version the client read, the update fails with 409 if the task changed since
+    version: Optional[int] = None
 
 
 class MessageSchema(BaseModel):
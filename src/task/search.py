@@ -0,0 +1,56 @@
+from sqlalchemy import Integer, String, column, func, select, table, text
+from fastapi.exceptions import HTTPException
+from src.task.models import Task
+
+# Lightweight table construct, the virtual table is not part of the metadata
+tasks_fts = table("tasks_fts", column("rowid", Integer), column("title", String))
+
+
+def build_match_query(q: str):
+    """Turn user input into an FTS5 query matching every word.
+
+    Each word is quoted, so FTS5 operators and punctuation in the input are
+    searched for literally instead of raising syntax errors.
+
+    Args:
+        q (str): Search text.
+
+    Raises:
+        HTTPException: If the text holds no word.
+
+    Returns:
+        str: FTS5 MATCH expression.
+    """
+    words = q.split()
+    if not words:
+        raise HTTPException(status_code=400, detail="Search text is empty")
+
+    return " ".join('"' + word.replace('"', '""') + '"' for word in words)
+
+
+def search_tasks_query(q: str, *criteria):
+    """Build the subquery of the tasks matching a search, with their rank.
+
+    Args:
+        q (str): Search text.
+        *criteria (ColumnElement): Extra filters on the tasks.
+
+    Returns:
+        Subquery: Task columns and `rank`, the bm25 score (lower is better).
+    """
+    rank = func.bm25(text("tasks_fts")).label("rank")
+    return (
+        select(*Task.__table__.c, rank)
+        .join_from(tasks_fts, Task, Task.id == tasks_fts.c.rowid)
+        .where(tasks_fts.c.title.match(build_match_query(q)), *criteria)
+        .subquery()
+    )
+
+
+def rebuild_task_search(connection):
+    """Rebuild the search index from the tasks table
+
+    Args:
+        connection (Connection): Connection of the transaction to run in.
+    """
+    connection.execute(text("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')"))
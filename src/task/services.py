@@ -1,8 +1,52 @@
-from database import get_db
+import logging
+import time
+from database import SessionLocal, get_db, get_async_db
 from fastapi import Depends
 from sqlalchemy.orm import Session
-from src.task.models import Task
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.task.models import Task, TaskCategory, TaskStat
+from datetime import datetime
+from typing import Callable, Optional
+from collections import Counter
+from sqlalchemy import (
+    and_,
+    delete,
+    event,
+    exists,
+    func,
+    insert,
+    inspect,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from fastapi.exceptions import HTTPException
+from src.task.feed import (
+    deleted_event,
+    queue_task_event,
+    reassigned_event,
+    updated_event,
+)
+from src.task.schemas import TaskReassignPayloadSchema
+from src.user.models import User
+from src.user.services import get_user_by_id
+from cache import (
+    LRUTTLCache,
+    get_cached,
+    get_cached_async,
+    invalidate_after_commit,
+    invalidate_on_write,
+)
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Read-through cache of Task rows, keyed by id
+task_cache = LRUTTLCache(maxsize=settings.CACHE_MAXSIZE, ttl=settings.CACHE_TTL)
+
+# Drop cached rows when they are updated or deleted
+invalidate_on_write(Task, task_cache)
 
 
 def get_task_by_id(task_id: int, db: Session = Depends(get_db)):
@@ -18,10 +62,582 @@ def get_task_by_id(task_id: int, db: Session = Depends(get_db)):
     Returns:
         Task object: return task obj.
     """
-    task = db.query(Task).get(task_id)
+    task = get_cached(db, Task, task_cache, task_id)
     if not task:
         raise HTTPException(
             status_code=400, detail=f"Task id: {task_id} not exist in database"
         )
 
     return task
+
+
+def get_task_filters(
+    assign_to: Optional[int] = None,
+    category: Optional[TaskCategory] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    updated_after: Optional[datetime] = None,
+    updated_before: Optional[datetime] = None,
+):
+    """Dependency building the filters of the task list from query parameters
+
+    Args:
+        assign_to (int, optional): Only tasks assigned to this user.
+        category (TaskCategory, optional): Only tasks of this category.
+        created_after (datetime, optional): Only tasks created at or after this time.
+        created_before (datetime, optional): Only tasks created before this time.
+        updated_after (datetime, optional): Only tasks updated at or after this time.
+        updated_before (datetime, optional): Only tasks updated before this time.
+
+    Returns:
+        list: SQL criteria to apply to the tasks query.
+    """
+    criteria = []
+    if assign_to is not None:
+        criteria.append(Task.assign_to == assign_to)
+    if category is not None:
+        criteria.append(Task.category == category.value)
+    if created_after is not None:
+        criteria.append(Task.created_at >= created_after)
+    if created_before is not None:
+        criteria.append(Task.created_at < created_before)
+    if updated_after is not None:
+        criteria.append(Task.updated_at >= updated_after)
+    if updated_before is not None:
+        criteria.append(Task.updated_at < updated_before)
+    return criteria
+
+
+async def get_task_by_id_async(task_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get task based on task id, using an async session
+
+    Args:
+        task_id (int): task id, which want to get.
+        db (AsyncSession, optional): Async database session object. Defaults to Depends(get_async_db).
+
+    Raises:
+        HTTPException: Raise Exception, if id not exist in database.
+
+    Returns:
+        Task object: return task obj.
+    """
+    task = await get_cached_async(db, Task, task_cache, task_id)
+    if not task:
+        raise HTTPException(
+            status_code=400, detail=f"Task id: {task_id} not exist in database"
+        )
+
+    return task
+
+
+def _task_update_statement(task_id: int, values: dict, version: Optional[int]):
+    """Build the UPDATE of one task, guarded by its assignee and, when one is given,
+    by its version.
+
+    No row is returned if the task does not exist, its version is not `version`
+    or the new assignee does not exist.
+    """
+    tasks_table = Task.__table__
+    criteria = [tasks_table.c.id == task_id]
+    if version is not None:
+        criteria.append(tasks_table.c.version == version)
+    if values.get("assign_to") is not None:
+        criteria.append(exists().where(User.id == values["assign_to"]))
+
+    return (
+        update(tasks_table)
+        .where(*criteria)
+        .values(**values, version=tasks_table.c.version + 1)
+        .returning(*tasks_table.c)
+    )
+
+
+def _previous_task_statement(task_id: int):
+    """Build the SELECT of the counted columns of a task, before its update."""
+    return select(Task.assign_to, Task.category).where(Task.id == task_id)
+
+
+def _task_conflict(task_id: int, version: int):
+    """Build the error of an update made against an old version of a task."""
+    return HTTPException(
+        status_code=409,
+        detail=f"Task id: {task_id} was modified, version {version} is outdated",
+    )
+
+
+def _after_task_update(db: Session, row, previous):
+    """Queue the task count, cache and change feed updates of a Core update."""
+    old = (previous.assign_to, previous.category) if previous else None
+    new = (row.assign_to, row.category)
+    if old is not None:
+        # The task was removed from its old count before the update
+        apply_task_stat_deltas(db.connection(), Counter({new: 1}))
+    invalidate_after_commit(db, task_cache, row.id)
+    queue_task_event(db, updated_event(row, *(old or new)))
+
+
+def update_task_by_id(
+    task_id: int, values: dict, db: Session, version: Optional[int] = None
+):
+    """Update a task with a single UPDATE ... RETURNING statement
+
+    The assignee is checked by the statement itself. Only a change of assignee or
+    category moves the task between the task counts, and reads its old values for
+    them. The caller commits.
+
+    Args:
+        task_id (int): task id, which want to update.
+        values (dict): New values of the task columns.
+        db (Session): Database session object.
+        version (int, optional): Expected version of the task, not checked if None.
+
+    Raises:
+        HTTPException: 400 if the task or the assignee does not exist, 409 if the
+            task is not at the expected version.
+
+    Returns:
+        Row: The updated task.
+    """
+    if not values:
+        task = get_task_by_id(task_id=task_id, db=db)
+        if version is not None and task.version != version:
+            raise _task_conflict(task_id, version)
+        return task
+
+    previous = None
+    if "assign_to" in values or "category" in values:
+        # Remove the task from its old count first. As the first write it opens the
+        # write transaction, so the old values read next are the ones the UPDATE
+        # changes.
+        db.execute(_task_stats_decrement([Task.id == task_id]))
+        previous = db.execute(_previous_task_statement(task_id)).one_or_none()
+        if previous is None:
+            raise HTTPException(
+                status_code=400, detail=f"Task id: {task_id} not exist in database"
+            )
+
+    row = db.execute(_task_update_statement(task_id, values, version)).one_or_none()
+    if row is None:
+        # Find out why nothing was updated, only on the failure path
+        if db.scalar(select(Task.id).where(Task.id == task_id)) is None:
+            raise HTTPException(
+                status_code=400, detail=f"Task id: {task_id} not exist in database"
+            )
+        assign_to = values.get("assign_to")
+        if assign_to is not None and db.get(User, assign_to) is None:
+            raise HTTPException(
+                status_code=400, detail=f"User id: {assign_to} not exist in database"
+            )
+        raise _task_conflict(task_id, version)
+
+    _after_task_update(db, row, previous)
+    return row
+
+
+async def update_task_by_id_async(
+    task_id: int, values: dict, db: AsyncSession, version: Optional[int] = None
+):
+    """Async version of `update_task_by_id`, for an AsyncSession.
+
+    Args:
+        task_id (int): task id, which want to update.
+        values (dict): New values of the task columns.
+        db (AsyncSession): Async database session object.
+        version (int, optional): Expected version of the task, not checked if None.
+
+    Raises:
+        HTTPException: 400 if the task or the assignee does not exist, 409 if the
+            task is not at the expected version.
+
+    Returns:
+        Row: The updated task.
+    """
+    if not values:
+        task = await get_task_by_id_async(task_id=task_id, db=db)
+        if version is not None and task.version != version:
+            raise _task_conflict(task_id, version)
+        return task
+
+    previous = None
+    if "assign_to" in values or "category" in values:
+        await db.execute(_task_stats_decrement([Task.id == task_id]))
+        result = await db.execute(_previous_task_statement(task_id))
+        previous = result.one_or_none()
+        if previous is None:
+            raise HTTPException(
+                status_code=400, detail=f"Task id: {task_id} not exist in database"
+            )
+
+    result = await db.execute(_task_update_statement(task_id, values, version))
+    row = result.one_or_none()
+    if row is None:
+        if await db.scalar(select(Task.id).where(Task.id == task_id)) is None:
+            raise HTTPException(
+                status_code=400, detail=f"Task id: {task_id} not exist in database"
+            )
+        assign_to = values.get("assign_to")
+        if assign_to is not None and await db.get(User, assign_to) is None:
+            raise HTTPException(
+                status_code=400, detail=f"User id: {assign_to} not exist in database"
+            )
+        raise _task_conflict(task_id, version)
+
+    await db.run_sync(_after_task_update, row, previous)
+    return row
+
+
+def apply_task_stat_deltas(connection, deltas: Counter):
+    """Add deltas to the per user, per category task counts
+
+    Args:
+        connection (Connection): Connection of the transaction writing the tasks.
+        deltas (Counter): Count change for each (user_id, category) pair.
+    """
+    rows = [
+        dict(user_id=user_id, category=category, task_count=delta)
+        for (user_id, category), delta in deltas.items()
+        if user_id is not None and delta
+    ]
+    if not rows:
+        return
+
+    # Upsert, so the first task of a pair creates its row
+    statement = sqlite_insert(TaskStat)
+    connection.execute(
+        statement.on_conflict_do_update(
+            index_elements=[TaskStat.user_id, TaskStat.category],
+            set_=dict(task_count=TaskStat.task_count + statement.excluded.task_count),
+        ),
+        rows,
+    )
+
+
+def _next_task_ids(session: Session, criteria: list, last_id: int, chunk_size: int):
+    """Get the ids of the next chunk of tasks matching some criteria
+
+    The criteria are wrapped in a function so SQLite walks the tasks by id from
+    `last_id` and stops after `chunk_size` matches. With an index of a filtered
+    column it would read and sort every remaining match for each chunk.
+
+    Args:
+        session (Session): Database session object.
+        criteria (list): Filters of the tasks.
+        last_id (int): Last id of the previous chunk, 0 for the first chunk.
+        chunk_size (int): Maximum number of ids.
+
+    Returns:
+        list: Matching task ids greater than `last_id`, in ascending order.
+    """
+    chunk_criteria = [Task.id > last_id]
+    if criteria:
+        chunk_criteria.append(func.coalesce(and_(*criteria), False))
+    return (
+        session.execute(
+            select(Task.id).where(*chunk_criteria).order_by(Task.id).limit(chunk_size)
+        )
+        .scalars()
+        .all()
+    )
+
+
+def delete_tasks_in_chunks(
+    criteria: list,
+    chunk_size: Optional[int] = None,
+    on_chunk: Optional[Callable[[int], None]] = None,
+):
+    """Delete the tasks matching some criteria, one chunk of ids at a time
+
+    Each chunk holds at most `chunk_size` tasks and is committed on its own, so the
+    write lock is released between chunks and only one chunk of ids is in memory.
+    Task counts and cached rows are updated with each chunk.
+
+    Args:
+        criteria (list): Filters of the tasks to delete, see `get_task_filters`.
+        chunk_size (int, optional): Tasks per chunk. Defaults to `DELETE_CHUNK_SIZE`.
+        on_chunk (Callable, optional): Called with the number of tasks deleted so
+            far after each committed chunk. An exception raised by it stops the
+            deletion, the committed chunks stay deleted.
+
+    Returns:
+        tuple: Number of deleted tasks and number of chunks.
+    """
+    chunk_size = chunk_size or settings.DELETE_CHUNK_SIZE
+    tasks_table = Task.__table__
+    deleted = chunks = 0
+    last_id = 0
+
+    session = SessionLocal()
+    try:
+        while True:
+            ids = _next_task_ids(session, criteria, last_id, chunk_size)
+            if not ids:
+                break
+
+            # The criteria are checked again, the tasks may have changed since
+            chunk_criteria = [tasks_table.c.id.in_(ids)]
+            if criteria:
+                chunk_criteria.append(func.coalesce(and_(*criteria), False))
+            rows = session.execute(
+                delete(tasks_table)
+                .where(*chunk_criteria)
+                .returning(
+                    tasks_table.c.id, tasks_table.c.assign_to, tasks_table.c.category
+                )
+            ).all()
+
+            # Core deletes skip the ORM events, so update the task counts and
+            # queue the change feed events here, one per assignee and category
+            deleted_ids = {}
+            for row in rows:
+                deleted_ids.setdefault((row.assign_to, row.category), []).append(row.id)
+            apply_task_stat_deltas(
+                session.connection(),
+                Counter({key: -len(ids) for key, ids in deleted_ids.items()}),
+            )
+            for (assign_to, category), ids_of_key in deleted_ids.items():
+                queue_task_event(
+                    session, deleted_event(ids_of_key, assign_to, category)
+                )
+            session.commit()
+
+            for row in rows:
+                task_cache.invalidate(row.id)
+            if rows:
+                deleted += len(rows)
+                chunks += 1
+                if on_chunk:
+                    on_chunk(deleted)
+
+            if len(ids) < chunk_size:
+                break
+            last_id = ids[-1]
+            time.sleep(settings.DELETE_CHUNK_PAUSE_MS / 1000)
+    finally:
+        session.close()
+
+    logger.info("Deleted %d tasks in %d chunks", deleted, chunks)
+    return deleted, chunks
+
+
+def get_task_reassignment(payload: TaskReassignPayloadSchema, db: Session):
+    """Turn a batch reassignment request into task criteria and new values
+
+    Args:
+        payload (TaskReassignPayloadSchema): Tasks to change and their new values.
+        db (Session): Database session object, to check the new assignee.
+
+    Raises:
+        HTTPException: If the tasks or the new values are missing or ambiguous, or
+            if the new assignee does not exist.
+
+    Returns:
+        tuple: Criteria of the tasks to change and dict of the new column values.
+    """
+    if (payload.ids is None) == (payload.filter is None):
+        raise HTTPException(status_code=400, detail="Give either ids or filter")
+    if payload.ids is not None and len(payload.ids) > settings.MAX_BULK_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.MAX_BULK_SIZE} ids per request, use a filter",
+        )
+
+    values = payload.model_dump(include={"assign_to", "category"}, exclude_unset=True)
+    if not values:
+        raise HTTPException(status_code=400, detail="Give assign_to or category")
+    if "category" in values:
+        values["category"] = values["category"].value
+    if values.get("assign_to") is not None:
+        get_user_by_id(user_id=values["assign_to"], db=db)
+
+    if payload.ids is not None:
+        criteria = [Task.id.in_(payload.ids)]
+    else:
+        criteria = get_task_filters(**dict(payload.filter))
+    # Leave out the tasks that already have the new values
+    criteria.append(
+        or_(
+            *(
+                getattr(Task, key).is_distinct_from(value)
+                for key, value in values.items()
+            )
+        )
+    )
+    return criteria, values
+
+
+def _task_stats_decrement(criteria: list):
+    """Build the upsert removing the matching tasks from the task counts."""
+    statement = sqlite_insert(TaskStat).from_select(
+        ["user_id", "category", "task_count"],
+        select(Task.assign_to, Task.category, -func.count())
+        .where(Task.assign_to.is_not(None), *criteria)
+        .group_by(Task.assign_to, Task.category),
+    )
+    return statement.on_conflict_do_update(
+        index_elements=[TaskStat.user_id, TaskStat.category],
+        set_=dict(task_count=TaskStat.task_count + statement.excluded.task_count),
+    )
+
+
+def reassign_tasks_in_chunks(
+    criteria: list,
+    values: dict,
+    chunk_size: Optional[int] = None,
+    on_chunk: Optional[Callable[[int], None]] = None,
+):
+    """Set the assignee and/or category of many tasks, one id range at a time
+
+    Each chunk is changed by one set-based UPDATE and committed on its own, like
+    `delete_tasks_in_chunks`. Task counts, cached rows and the change feed are
+    updated with each chunk.
+
+    Args:
+        criteria (list): Filters of the tasks to change, see `get_task_reassignment`.
+        values (dict): New `assign_to` and/or `category` of the tasks.
+        chunk_size (int, optional): Tasks per chunk. Defaults to `REASSIGN_CHUNK_SIZE`.
+        on_chunk (Callable, optional): Called with the number of tasks changed so
+            far after each committed chunk. An exception raised by it stops the
+            reassignment, the committed chunks stay changed.
+
+    Returns:
+        tuple: Number of changed tasks and number of chunks.
+    """
+    chunk_size = chunk_size or settings.REASSIGN_CHUNK_SIZE
+    tasks_table = Task.__table__
+    updated = chunks = 0
+    last_id = 0
+
+    session = SessionLocal()
+    try:
+        while True:
+            # Ids of the chunk. The writes below look the tasks up by id, an id range
+            # would let SQLite scan an index of the filtered column for each chunk.
+            ids = _next_task_ids(session, criteria, last_id, chunk_size)
+            if not ids:
+                break
+            # The criteria are checked again, the tasks may have changed since. They
+            # are wrapped in a function so SQLite looks the tasks up by id only.
+            chunk_criteria = [Task.id.in_(ids), func.coalesce(and_(*criteria), False)]
+            connection = session.connection()
+
+            # Remove the tasks from their old counts first. As the first write it
+            # opens the write transaction, so the old values read next are the
+            # ones the UPDATE changes.
+            connection.execute(_task_stats_decrement(chunk_criteria))
+            previous = {
+                task_id: (assign_to, category)
+                for task_id, assign_to, category in connection.execute(
+                    select(Task.id, Task.assign_to, Task.category).where(
+                        *chunk_criteria
+                    )
+                )
+            }
+            rows = connection.execute(
+                update(tasks_table)
+                .where(*chunk_criteria)
+                .values(**values, version=tasks_table.c.version + 1)
+                .returning(
+                    tasks_table.c.id, tasks_table.c.assign_to, tasks_table.c.category
+                )
+            ).all()
+
+            # Add the tasks to their new counts, one feed event per move
+            deltas = Counter()
+            moves = {}
+            for row in rows:
+                deltas[(row.assign_to, row.category)] += 1
+                key = (row.assign_to, row.category, *previous[row.id])
+                moves.setdefault(key, []).append(row.id)
+            apply_task_stat_deltas(connection, deltas)
+            for key, moved_ids in moves.items():
+                queue_task_event(session, reassigned_event(moved_ids, *key))
+            session.commit()
+
+            for row in rows:
+                task_cache.invalidate(row.id)
+            if rows:
+                updated += len(rows)
+                chunks += 1
+                if on_chunk:
+                    on_chunk(updated)
+
+            if len(ids) < chunk_size:
+                break
+            last_id = ids[-1]
+            time.sleep(settings.REASSIGN_CHUNK_PAUSE_MS / 1000)
+    finally:
+        session.close()
+
+    logger.info("Reassigned %d tasks in %d chunks", updated, chunks)
+    return updated, chunks
+
+
+def rebuild_task_stats(connection):
+    """Recompute every task count from the tasks table
+
+    Args:
+        connection (Connection): Connection of the transaction to run in.
+    """
+    connection.execute(delete(TaskStat))
+    connection.execute(
+        insert(TaskStat).from_select(
+            ["user_id", "category", "task_count"],
+            select(Task.assign_to, Task.category, func.count())
+            .where(Task.assign_to.is_not(None))
+            .group_by(Task.assign_to, Task.category),
+        )
+    )
+
+
+def _old_value(state, key):
+    """Value of an attribute before the pending change."""
+    history = state.attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(state.object, key)
+
+
+@event.listens_for(Task, "after_insert")
+def _count_inserted_task(mapper, connection, target):
+    apply_task_stat_deltas(
+        connection, Counter({(target.assign_to, target.category): 1})
+    )
+
+
+@event.listens_for(Task, "after_update")
+def _count_updated_task(mapper, connection, target):
+    state = inspect(target)
+    old = (_old_value(state, "assign_to"), _old_value(state, "category"))
+    new = (target.assign_to, target.category)
+    if old != new:
+        apply_task_stat_deltas(connection, Counter({old: -1, new: 1}))
+
+
+@event.listens_for(Task, "after_delete")
+def _count_deleted_task(mapper, connection, target):
+    apply_task_stat_deltas(
+        connection, Counter({(target.assign_to, target.category): -1})
+    )
+
+
+@event.listens_for(Session, "after_bulk_delete")
+def _recount_after_bulk_delete(delete_context):
+    # The deleted rows are unknown, recompute the counts in the same transaction
+    if delete_context.mapper.class_ is Task:
+        rebuild_task_stats(delete_context.session.connection())
+
+
+def get_task_stats(db: Session, user_id: Optional[int] = None):
+    """Get the task counts per user and category
+
+    Args:
+        db (Session): Database session object.
+        user_id (int, optional): Only return the counts of this user.
+
+    Returns:
+        list: TaskStat rows ordered by user and category.
+    """
+    query = db.query(TaskStat).filter(TaskStat.task_count > 0)
+    if user_id is not None:
+        query = query.filter(TaskStat.user_id == user_id)
+    return query.order_by(TaskStat.user_id, TaskStat.category).all()
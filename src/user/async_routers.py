@@ -0,0 +1,169 @@
+from fastapi import Depends, Query, Path, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from config import settings
+from database import get_async_db
+from pagination import keyset, build_page
+from responses import page_response
+from conditional import (
+    check_conditional,
+    collection_state,
+    collection_validators,
+    item_validators,
+)
+from src.user.models import User
+from src.user.routers import router
+from src.user.schemas import (
+    UserCreatePayloadSchema,
+    UserUpdatePayloadSchema,
+    UserResponseSchema,
+    UserPageResponseSchema,
+    user_page_adapter,
+)
+from src.user.services import (
+    get_user_by_id_async,
+    update_user_by_id_async,
+    USER_RESPONSE_COLUMNS,
+)
+from validators import validate_password_async
+
+# Async counterparts of the handlers in src/user/routers.py. Importing this module
+# replaces the sync routes on the shared router, see router.py.
+
+
+@router.get("", response_model=UserPageResponseSchema)
+async def get_users(
+    request: Request,
+    response: Response,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get one page of users, ordered by id
+
+    Args:
+        request (Request): Incoming request, read for conditional headers.
+        response (Response): Response, receives the ETag and Last-Modified headers.
+        limit (int, optional): Maximum number of users in the page.
+        after (str, optional): Cursor returned as `next_cursor` by the previous page.
+        db (AsyncSession, optional): Async database session object. Defaults to Depends(get_async_db).
+
+    Returns:
+        UserPageResponseSchema: Users of the page and the cursor of the next page,
+            or an empty 304 response if the client copy is still fresh
+    """
+    # Answer with 304 if the collection did not change since the client fetched it
+    state = (await db.execute(collection_state(User))).one()
+    etag, last_modified = collection_validators(state, limit, after)
+    not_modified = check_conditional(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+
+    # Get the columns of the User records that follow the cursor
+    statement = keyset(
+        select(*USER_RESPONSE_COLUMNS), User.id, limit=limit, after=after
+    )
+    rows = (await db.execute(statement)).all()
+    users, next_cursor = build_page(rows, limit)
+
+    # Validate and encode the whole page at once, based on the response schema
+    return page_response(user_page_adapter, users, next_cursor, response)
+
+
+@router.get("/{user_id}", response_model=UserResponseSchema)
+async def get_user(
+    request: Request,
+    response: Response,
+    user_id: int = Path(ge=1),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get a user by id
+
+    Args:
+        user_id (int): ID of the user to get.
+        request (Request): Incoming request, read for conditional headers.
+        response (Response): Response, receives the ETag and Last-Modified headers.
+        db (AsyncSession, optional): Async database session object. Defaults to Depends(get_async_db).
+
+    Returns:
+        UserResponseSchema: The user object, or an empty 304 response if the
+            client copy is still fresh
+    """
+    user = await get_user_by_id_async(user_id=user_id, db=db)
+
+    # Answer with 304 if the user did not change since the client fetched it
+    etag, last_modified = item_validators(user)
+    not_modified = check_conditional(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+
+    return UserResponseSchema.from_orm(user)
+
+
+@router.post("", response_model=UserResponseSchema)
+async def create_user(
+    payload: UserCreatePayloadSchema, db: AsyncSession = Depends(get_async_db)
+):
+    """Create a new user
+
+    Args:
+        payload (UserCreatePayloadSchema): User details needed to create a new user record.
+        db (AsyncSession, optional): Async database session object. Defaults to Depends(get_async_db).
+
+    Returns:
+        UserResponseSchema: Newly created user object
+    """
+    # Validate password, the hash is computed in the hashing process pool
+    check_password = await validate_password_async(
+        password=payload.password, confirm_password=payload.confirm_password
+    )
+
+    if check_password:
+        # Create a new User object with the provided details
+        new_user = User(
+            username=payload.username,
+            email=payload.email,
+            phn_no=payload.phn_no,
+            password=check_password,
+        )
+        # Add the user object to the database
+        db.add(new_user)
+        # Commit the changes to the database
+        await db.commit()
+
+        # Return the user object based on the response schema
+        return UserResponseSchema.from_orm(new_user)
+
+
+@router.patch("/{user_id}", response_model=UserResponseSchema)
+async def update_user(
+    user_id: int,
+    payload: UserUpdatePayloadSchema,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Update a user object
+
+    Args:
+        user_id (int): ID of the user to update.
+        payload (UserUpdatePayloadSchema): Data to update the user with.
+        db (AsyncSession, optional): Async database session object. Defaults to Depends(get_async_db).
+
+    Returns:
+        UserResponseSchema: Updated user object
+    """
+    # Columns to update, unset and null fields are left unchanged
+    update_data = payload.dict(exclude_unset=True)
+    version = update_data.pop("version", None)
+    update_data = {
+        field: value for field, value in update_data.items() if value is not None
+    }
+
+    # Update the user in one statement, then commit the changes to the database
+    user = await update_user_by_id_async(
+        user_id=user_id, values=update_data, db=db, version=version
+    )
+    await db.commit()
+
+    # Return the updated user object based on the response schema
+    return UserResponseSchema.from_orm(user)
@@ -0,0 +1,100 @@
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from authentications import get_hash_executor, get_password_hash
+from database import SessionLocal
+from src.job.services import JobContext, register_job_kind
+from src.user.models import User
+from src.user.schemas import UserImportJobParamsSchema
+from src.user.services import get_taken_usernames_and_emails
+
+# Number of users checked, hashed and inserted per transaction
+IMPORT_CHUNK_SIZE = 100
+
+
+def _summarize_import(params: UserImportJobParamsSchema):
+    # Passwords must not be stored in the jobs table
+    return {"users": len(params.users)}
+
+
+@register_job_kind("import-users", UserImportJobParamsSchema, _summarize_import)
+def import_users_job(job: JobContext, params: UserImportJobParamsSchema):
+    """Import users in chunks, without the size limit of POST /users/bulk
+
+    Each chunk is checked with set based queries, its passwords are hashed in the
+    hashing process pool and its valid users are inserted and committed at once.
+
+    Args:
+        job (JobContext): Running job, progress is the number of processed users.
+        params (UserImportJobParamsSchema): Details of the users to create.
+
+    Returns:
+        dict: Number of created users, users skipped because a concurrent request
+            created them first, and the error of each invalid user by index.
+    """
+    users = params.users
+    job.report(0, len(users))
+    created = skipped = 0
+    errors = []
+    # Usernames and emails of the previous chunks, later rows must not reuse them
+    seen_usernames, seen_emails = set(), set()
+
+    for offset in range(0, len(users), IMPORT_CHUNK_SIZE):
+        chunk = users[offset : offset + IMPORT_CHUNK_SIZE]
+        with SessionLocal() as session:
+            taken_usernames, taken_emails = get_taken_usernames_and_emails(
+                usernames=(item.username for item in chunk),
+                emails=(item.email for item in chunk),
+                db=session,
+            )
+        taken_usernames |= seen_usernames
+        taken_emails |= seen_emails
+
+        candidates = []
+        for index, item in enumerate(chunk, start=offset):
+            error = None
+            if item.password != item.confirm_password:
+                error = "Password and Confirm password do not match"
+            elif item.username in taken_usernames:
+                error = f"Username: {item.username} already exists"
+            elif item.email in taken_emails:
+                error = f"Email: {item.email} already exists"
+
+            if error is not None:
+                errors.append({"index": index, "error": error})
+                continue
+            taken_usernames.add(item.username)
+            taken_emails.add(item.email)
+            seen_usernames.add(item.username)
+            seen_emails.add(item.email)
+            candidates.append(item)
+
+        if candidates:
+            # bcrypt is CPU bound, hash the chunk in the hashing process pool
+            hashed_passwords = get_hash_executor().map(
+                get_password_hash, [item.password for item in candidates]
+            )
+            rows = [
+                dict(
+                    username=item.username,
+                    email=item.email,
+                    phn_no=item.phn_no,
+                    password=hashed_password,
+                )
+                for item, hashed_password in zip(candidates, hashed_passwords)
+            ]
+
+            # Users created by a concurrent request in the meantime are skipped
+            users_table = User.__table__
+            with SessionLocal() as session:
+                new_users = session.execute(
+                    sqlite_insert(users_table)
+                    .on_conflict_do_nothing()
+                    .returning(users_table.c.id),
+                    rows,
+                ).all()
+                session.commit()
+            created += len(new_users)
+            skipped += len(rows) - len(new_users)
+
+        job.report(offset + len(chunk))
+
+    return {"created": created, "skipped": skipped, "errors": errors}
@@ -1,3 +1,4 @@
+from conditional import track_collection
 from database import Base
 from sqlalchemy import Column, Integer, DateTime, String, Boolean
 from datetime import datetime
@@ -17,3 +18,9 @@ class User(Base):
     is_active = Column(Boolean)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Incremented by every update, PATCH requests can send it to detect conflicts
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+
+# Bump the version of the users collection on every write, for the ETag of GET /users
+track_collection(User)
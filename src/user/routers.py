@@ -4,15 +4,41 @@ from src.user.schemas import (
     UserCreatePayloadSchema,
     UserUpdatePayloadSchema,
     UserResponseSchema,
-    MessageSchema,
+    UserPageResponseSchema,
+    user_page_adapter,
+    UserBulkItemResultSchema,
+    UserBulkResponseSchema,
+    user_create_adapter,
 )
-from database import get_db
+from database import get_db, get_read_db
 from src.user.models import User
-from fastapi import Depends
+from fastapi import Depends, Query, Path, HTTPException, Request, Response
 from sqlalchemy.orm import Session
-from validators import validate_password
-from typing import List
-from src.user.services import get_user_by_id
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from pydantic import ValidationError
+from fastapi.concurrency import run_in_threadpool
+from validators import validate_password_async
+from authentications import get_password_hash_async
+from typing import Any, List, Optional
+from src.user.services import (
+    get_user_by_id,
+    get_taken_usernames_and_emails,
+    update_user_by_id,
+    USER_RESPONSE_COLUMNS,
+)
+from pagination import keyset, build_page
+from responses import page_response
+from conditional import (
+    check_conditional,
+    collection_state,
+    collection_validators,
+    item_validators,
+)
+from exports import ExportFormat, export_response
+from src.auth.services import get_current_user
+from sqlalchemy import select
+import asyncio
+from config import settings
 
 # Create the router using SQLAlchemyCRUDRouter from fastapi_crudrouter
 router = SQLAlchemyCRUDRouter(
@@ -32,25 +58,114 @@ router = SQLAlchemyCRUDRouter(
 )
 
 
-@router.get("", response_model=List[UserResponseSchema])
-def get_users(db: Session = Depends(get_db)):
-    """Get all the users
+@router.get("", response_model=UserPageResponseSchema)
+def get_users(
+    request: Request,
+    response: Response,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+):
+    """Get one page of users, ordered by id
 
     Args:
-        db (Session, optional): Database session object. Defaults to Depends(get_db).
+        request (Request): Incoming request, read for conditional headers.
+        response (Response): Response, receives the ETag and Last-Modified headers.
+        limit (int, optional): Maximum number of users in the page.
+        after (str, optional): Cursor returned as `next_cursor` by the previous page.
+        db (Session, optional): Database session object. Defaults to Depends(get_read_db).
+
+    Returns:
+        UserPageResponseSchema: Users of the page and the cursor of the next page,
+            or an empty 304 response if the client copy is still fresh
+    """
+    # Answer with 304 if the collection did not change since the client fetched it
+    state = db.execute(collection_state(User)).one()
+    etag, last_modified = collection_validators(state, limit, after)
+    not_modified = check_conditional(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+
+    # Get the columns of the User records that follow the cursor
+    statement = keyset(
+        select(*USER_RESPONSE_COLUMNS), User.id, limit=limit, after=after
+    )
+    rows = db.execute(statement).all()
+    users, next_cursor = build_page(rows, limit)
+
+    # Validate and encode the whole page at once, based on the response schema
+    return page_response(user_page_adapter, users, next_cursor, response)
+
+
+@router.get("/export")
+def export_users(format: ExportFormat = ExportFormat.NDJSON):
+    """Stream every user as NDJSON or CSV
+
+    Args:
+        format (ExportFormat, optional): Output format. Defaults to NDJSON.
+
+    Returns:
+        StreamingResponse: Users streamed in chunks, ordered by id
+    """
+    # Export every column except the password hash
+    columns = [
+        User.id,
+        User.username,
+        User.email,
+        User.phn_no,
+        User.is_active,
+        User.created_at,
+        User.updated_at,
+    ]
+    statement = select(*columns).order_by(User.id)
+    return export_response(statement, columns, format, name="users")
+
+
+@router.get("/me", response_model=UserResponseSchema)
+async def get_me(user: User = Depends(get_current_user)):
+    """Get the user authenticated by the bearer token
+
+    Args:
+        user (User): Authenticated user. Defaults to Depends(get_current_user).
+
+    Returns:
+        UserResponseSchema: The authenticated user object
+    """
+    return UserResponseSchema.from_orm(user)
+
+
+@router.get("/{user_id}", response_model=UserResponseSchema)
+def get_user(
+    request: Request,
+    response: Response,
+    user_id: int = Path(ge=1),
+    db: Session = Depends(get_read_db),
+):
+    """Get a user by id
+
+    Args:
+        user_id (int): ID of the user to get.
+        request (Request): Incoming request, read for conditional headers.
+        response (Response): Response, receives the ETag and Last-Modified headers.
+        db (Session, optional): Database session object. Defaults to Depends(get_read_db).
 
     Returns:
-        List of UserResponseSchema: List of user objects
+        UserResponseSchema: The user object, or an empty 304 response if the
+            client copy is still fresh
     """
-    # Get all User records from the database
-    all_users = db.query(User).all()
+    user = get_user_by_id(user_id=user_id, db=db)
 
-    # Iterate through all users and return them based on the response schema
-    return [UserResponseSchema(**(vars(user))) for user in all_users]
+    # Answer with 304 if the user did not change since the client fetched it
+    etag, last_modified = item_validators(user)
+    not_modified = check_conditional(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+
+    return UserResponseSchema.from_orm(user)
 
 
 @router.post("", response_model=UserResponseSchema)
-def create_user(payload: UserCreatePayloadSchema, db: Session = Depends(get_db)):
+async def create_user(payload: UserCreatePayloadSchema, db: Session = Depends(get_db)):
     """Create a new user
 
     Args:
@@ -60,8 +175,8 @@ def create_user(payload: UserCreatePayloadSchema, db: Session = Depends(get_db))
     Returns:
         UserResponseSchema: Newly created user object
     """
-    # Validate password
-    check_password = validate_password(
+    # Validate password, the hash is computed in the hashing process pool
+    check_password = await validate_password_async(
         password=payload.password, confirm_password=payload.confirm_password
     )
 
@@ -75,13 +190,128 @@ def create_user(payload: UserCreatePayloadSchema, db: Session = Depends(get_db))
         )
         # Add the user object to the database
         db.add(new_user)
-        # Commit the changes to the database
-        db.commit()
+        # Commit the changes to the database, off the event loop
+        await run_in_threadpool(db.commit)
 
         # Return the user object based on the response schema
         return UserResponseSchema.from_orm(new_user)
 
 
+@router.post("/bulk", response_model=UserBulkResponseSchema)
+async def create_users_bulk(payload: List[Any], db: Session = Depends(get_db)):
+    """Import many users in one transaction
+
+    Each item is validated on its own, usernames and emails are checked for the
+    whole batch with set based queries, passwords are hashed in parallel in the
+    hashing process pool and the valid users are inserted with one multi-row
+    INSERT. Invalid rows are reported and skipped, they do not abort the batch.
+
+    Args:
+        payload (List[Any]): Details of the users to create, each item is a
+            UserCreatePayloadSchema.
+        db (Session, optional): Database session object. Defaults to Depends(get_db).
+
+    Raises:
+        HTTPException: If the payload has more than `MAX_BULK_SIZE` items.
+
+    Returns:
+        UserBulkResponseSchema: Created user or error for each item, in payload order
+    """
+    if len(payload) > settings.MAX_BULK_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.MAX_BULK_SIZE} users can be imported at once",
+        )
+
+    # Validate the items one by one, an invalid item only fails its own row
+    results = []
+    items = []
+    for index, raw_item in enumerate(payload):
+        try:
+            items.append((index, user_create_adapter.validate_python(raw_item)))
+            results.append(UserBulkItemResultSchema(index=index))
+        except ValidationError as e:
+            error = "; ".join(
+                f"{'.'.join(map(str, detail['loc'])) or 'item'}: {detail['msg']}"
+                for detail in e.errors(include_url=False)
+            )
+            results.append(UserBulkItemResultSchema(index=index, error=error))
+
+    # Check uniqueness of the whole batch with one query per column
+    taken_usernames, taken_emails = await run_in_threadpool(
+        get_taken_usernames_and_emails,
+        usernames=(item.username for _, item in items),
+        emails=(item.email for _, item in items),
+        db=db,
+    )
+
+    candidates = []
+    for index, item in items:
+        error = None
+        if item.password != item.confirm_password:
+            error = "Password and Confirm password do not match"
+        elif item.username in taken_usernames:
+            error = f"Username: {item.username} already exists"
+        elif item.email in taken_emails:
+            error = f"Email: {item.email} already exists"
+
+        if error is not None:
+            results[index].error = error
+            continue
+        # Later rows of the batch must not reuse this username or email
+        taken_usernames.add(item.username)
+        taken_emails.add(item.email)
+        candidates.append((index, item))
+
+    if not candidates:
+        return UserBulkResponseSchema(created=0, results=results)
+
+    # Hash all passwords in parallel, one bcrypt call per process
+    hashed_passwords = await asyncio.gather(
+        *(get_password_hash_async(item.password) for _, item in candidates)
+    )
+    rows = [
+        dict(
+            username=item.username,
+            email=item.email,
+            phn_no=item.phn_no,
+            password=hashed_password,
+        )
+        for (_, item), hashed_password in zip(candidates, hashed_passwords)
+    ]
+
+    def insert_users():
+        # Insert all valid users with one multi-row INSERT and commit once, users
+        # created by a concurrent request in the meantime are skipped
+        users_table = User.__table__
+        new_users = db.execute(
+            sqlite_insert(users_table)
+            .on_conflict_do_nothing()
+            .returning(*users_table.c),
+            rows,
+        ).all()
+        db.commit()
+        return new_users
+
+    new_users = await run_in_threadpool(insert_users)
+
+    # Skipped rows are not returned, match the created users by username
+    created = {user.username: user for user in new_users}
+    for index, item in candidates:
+        user = created.get(item.username)
+        if user is None:
+            results[index].error = (
+                f"Username: {item.username} or email: {item.email} "
+                "was created by a concurrent request"
+            )
+        else:
+            results[index].user = UserResponseSchema.from_orm(user)
+
+    return UserBulkResponseSchema(
+        created=len(new_users), skipped=len(rows) - len(new_users), results=results
+    )
+
+
 @router.patch("/{user_id}", response_model=UserResponseSchema)
 def update_user(
     user_id: int, payload: UserUpdatePayloadSchema, db: Session = Depends(get_db)
@@ -96,28 +326,18 @@ def update_user(
     Returns:
         UserResponseSchema: Updated user object
     """
-    # Get the user object based on the provided user_id
-    user = get_user_by_id(user_id=user_id, db=db)
-
-    if user:
-        # Convert the payload to a dictionary and exclude unset values
-        update_data = payload.dict(exclude_unset=True)
+    # Columns to update, unset and null fields are left unchanged
+    update_data = payload.dict(exclude_unset=True)
+    version = update_data.pop("version", None)
+    update_data = {
+        field: value for field, value in update_data.items() if value is not None
+    }
 
-        # Iterate through the dictionary items
-        for field, value in update_data.items():
-            if value is not None:
-                # Update the fields in the user object
-                setattr(user, field, value)
-
-        # Add the updated user object to the database
-        db.add(user)
-        # Commit the changes to the database
-        db.commit()
-        # Refresh and reflect the changes
-        db.refresh(user)
-
-        # Return the updated user object based on the response schema
-        return UserResponseSchema.from_orm(user)
+    # Update the user in one statement, then commit the changes to the database
+    user = update_user_by_id(
+        user_id=user_id, values=update_data, db=db, version=version
+    )
+    db.commit()
 
-    # Return an error message if the user_id doesn't exist in the database
-    return MessageSchema(message=f"user_id: {user_id} does not exist in the database")
+    # Return the updated user object based on the response schema
+    return UserResponseSchema.from_orm(user)
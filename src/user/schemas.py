@@ -1,13 +1,38 @@
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, TypeAdapter, validator
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from email_validator import validate_email, EmailNotValidError
 import re
+from functools import lru_cache
+from pagination import PageSchema
+from config import settings
 
 
-class UserBaseSchema(BaseModel):
+@lru_cache(maxsize=settings.EMAIL_CACHE_SIZE)
+def normalize_email(value: str):
+    """Validate an email address and return its normalized form.
+
+    The deliverability (DNS) check only runs if `EMAIL_CHECK_DELIVERABILITY` is set,
+    and results are memoized, so repeated addresses are parsed once.
+
+    Args:
+        value (str): Email address to validate.
+
+    Returns:
+        str: The normalized email address.
+
+    Raises:
+        EmailNotValidError: If the email address is not valid.
     """
-    Represents the base schema for a user.
+    emailinfo = validate_email(
+        value, check_deliverability=settings.EMAIL_CHECK_DELIVERABILITY
+    )
+    return emailinfo.normalized
+
+
+class UserFieldsSchema(BaseModel):
+    """
+    Represents the fields of a user, without input validation.
     """
 
     username: str
@@ -22,6 +47,13 @@ class UserBaseSchema(BaseModel):
         # Enable automatic conversion from attributes to dict during model initialization
         from_attributes = True
 
+
+class UserBaseSchema(UserFieldsSchema):
+    """
+    Represents the base schema for a user.
+    Inherits from UserFieldsSchema and validates the input fields.
+    """
+
     @validator("email")
     def validate_email(cls, value):
         """
@@ -41,11 +73,8 @@ class UserBaseSchema(BaseModel):
         """
 
         try:
-            emailinfo = validate_email(value)
-
             # After this point, use only the normalized form of the email address,
-            email = emailinfo.normalized
-            return email
+            return normalize_email(value)
         except EmailNotValidError as e:
             raise ValueError("Not a valid email address.")
 
@@ -89,15 +118,63 @@ class UserCreatePayloadSchema(UserBaseSchema):
     confirm_password: str
 
 
-class UserResponseSchema(UserBaseSchema):
+class UserResponseSchema(UserFieldsSchema):
     """
     Represents the schema for a user response.
-    Inherits from UserBaseSchema.
+    Inherits from UserFieldsSchema, the data comes from the database and was
+    validated when it was written.
     """
 
     id: int
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
+    version: Optional[int] = None
+
+
+class UserPageResponseSchema(PageSchema[UserResponseSchema]):
+    """
+    Represents one page of users.
+    """
+
+    pass
+
+
+# Validates and serializes a whole page of user rows in one call each
+user_page_adapter = TypeAdapter(UserPageResponseSchema)
+
+
+# Validates the items of a bulk import one by one, so one invalid item does not
+# reject the whole batch
+user_create_adapter = TypeAdapter(UserCreatePayloadSchema)
+
+
+class UserBulkItemResultSchema(BaseModel):
+    """
+    Represents the result of one item of a bulk user import.
+    """
+
+    index: int
+    user: Optional[UserResponseSchema] = None
+    error: Optional[str] = None
+
+
+class UserBulkResponseSchema(BaseModel):
+    """
+    Represents the response of a bulk user import.
+    """
+
+    created: int
+    # Valid users not inserted because a concurrent request created them first
+    skipped: int = 0
+    results: List[UserBulkItemResultSchema]
+
+
+class UserImportJobParamsSchema(BaseModel):
+    """
+    Represents the params of an import-users job.
+    """
+
+    users: List[UserCreatePayloadSchema]
 
 
 class UserUpdatePayloadSchema(BaseModel):
@@ -108,6 +185,8 @@ class UserUpdatePayloadSchema(BaseModel):
     username: Optional[str] = None
     email: Optional[str] = None
     phn_no: Optional[int] = None
+    # Version the client read, the update fails with 409 if the user changed since
+    version: Optional[int] = None
 
 
 class MessageSchema(BaseModel):
@@ -1,9 +1,45 @@
-from database import get_db
+from database import get_db, get_async_db
 from fastapi import Depends
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.user.models import User
 from fastapi.exceptions import HTTPException
+from cache import (
+    LRUTTLCache,
+    get_cached,
+    get_cached_async,
+    invalidate_after_commit,
+    invalidate_on_write,
+)
+from config import settings
 from src.user.schemas import UserResponseSchema
+from typing import Iterable, Optional
+
+
+# Columns returned by the user endpoints, the password hash is never sent
+USER_RESPONSE_COLUMNS = [
+    User.id,
+    User.username,
+    User.email,
+    User.phn_no,
+    User.created_at,
+    User.updated_at,
+    User.version,
+]
+
+# Read-through cache of User rows, keyed by id
+user_cache = LRUTTLCache(maxsize=settings.CACHE_MAXSIZE, ttl=settings.CACHE_TTL)
+
+# Drop cached rows when they are updated or deleted
+invalidate_on_write(User, user_cache)
+
+# Detached User objects of the authenticated users, keyed by id, see
+# `src.auth.services.get_current_user`
+principal_cache = LRUTTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL
+)
+invalidate_on_write(User, principal_cache)
 
 
 def get_user_by_id(user_id: int, db: Session = Depends(get_db)):
@@ -20,7 +56,75 @@ def get_user_by_id(user_id: int, db: Session = Depends(get_db)):
         User object: Return User object
     """
     if user_id:
-        user = db.query(User).get(user_id)
+        user = get_cached(db, User, user_cache, user_id)
+        if not user:
+            raise HTTPException(
+                status_code=400, detail=f"User id: {user_id} not exist in database"
+            )
+
+        return user
+    return None
+
+
+def get_existing_user_ids(user_ids: Iterable[int], db: Session):
+    """Get which of the given user ids exist, with a single query
+
+    Args:
+        user_ids (Iterable[int]): user ids to look up.
+        db (Session): Database session object.
+
+    Returns:
+        set: The user ids that exist in the database.
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return set()
+
+    return set(db.scalars(select(User.id).where(User.id.in_(user_ids))))
+
+
+def get_taken_usernames_and_emails(
+    usernames: Iterable[str], emails: Iterable[str], db: Session
+):
+    """Get which of the given usernames and emails are already used
+
+    Args:
+        usernames (Iterable[str]): usernames to look up.
+        emails (Iterable[str]): emails to look up.
+        db (Session): Database session object.
+
+    Returns:
+        tuple: The taken usernames and the taken emails, as sets.
+    """
+    usernames, emails = set(usernames), set(emails)
+    taken_usernames = (
+        set(db.scalars(select(User.username).where(User.username.in_(usernames))))
+        if usernames
+        else set()
+    )
+    taken_emails = (
+        set(db.scalars(select(User.email).where(User.email.in_(emails))))
+        if emails
+        else set()
+    )
+    return taken_usernames, taken_emails
+
+
+async def get_user_by_id_async(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get user based on user id, using an async session
+
+    Args:
+        user_id (int): user id which obj want to get.
+        db (AsyncSession, optional): Async database session object. Defaults to Depends(get_async_db).
+
+    Raises:
+        HTTPException: Raise exception if id not exist in db.
+
+    Returns:
+        User object: Return User object
+    """
+    if user_id:
+        user = await get_cached_async(db, User, user_cache, user_id)
         if not user:
             raise HTTPException(
                 status_code=400, detail=f"User id: {user_id} not exist in database"
@@ -28,3 +132,103 @@ def get_user_by_id(user_id: int, db: Session = Depends(get_db)):
 
         return user
     return None
+
+
+def _user_update_statement(user_id: int, values: dict, version: Optional[int]):
+    """Build the UPDATE of one user, guarded by its version when one is given."""
+    users_table = User.__table__
+    criteria = [users_table.c.id == user_id]
+    if version is not None:
+        criteria.append(users_table.c.version == version)
+
+    return (
+        update(users_table)
+        .where(*criteria)
+        .values(**values, version=users_table.c.version + 1)
+        .returning(*users_table.c)
+    )
+
+
+def _user_update_error(user_id: int, version: Optional[int], exists: bool):
+    """Build the error of an update that matched no row."""
+    if not exists:
+        return HTTPException(
+            status_code=400, detail=f"User id: {user_id} not exist in database"
+        )
+    return HTTPException(
+        status_code=409,
+        detail=f"User id: {user_id} was modified, version {version} is outdated",
+    )
+
+
+def update_user_by_id(
+    user_id: int, values: dict, db: Session, version: Optional[int] = None
+):
+    """Update a user with a single UPDATE ... RETURNING statement
+
+    The caller commits.
+
+    Args:
+        user_id (int): user id which want to update.
+        values (dict): New values of the user columns.
+        db (Session): Database session object.
+        version (int, optional): Expected version of the user, not checked if None.
+
+    Raises:
+        HTTPException: 400 if the user does not exist, 409 if the user is not at
+            the expected version.
+
+    Returns:
+        Row: The updated user.
+    """
+    if not values:
+        user = get_user_by_id(user_id=user_id, db=db)
+        if version is not None and user.version != version:
+            raise _user_update_error(user_id, version, exists=True)
+        return user
+
+    row = db.execute(_user_update_statement(user_id, values, version)).one_or_none()
+    if row is None:
+        # Find out why nothing was updated, only on the failure path
+        exists = db.scalar(select(User.id).where(User.id == user_id)) is not None
+        raise _user_update_error(user_id, version, exists)
+
+    # Core updates skip the ORM events that keep the cache consistent
+    invalidate_after_commit(db, user_cache, user_id)
+    invalidate_after_commit(db, principal_cache, user_id)
+    return row
+
+
+async def update_user_by_id_async(
+    user_id: int, values: dict, db: AsyncSession, version: Optional[int] = None
+):
+    """Async version of `update_user_by_id`, for an AsyncSession.
+
+    Args:
+        user_id (int): user id which want to update.
+        values (dict): New values of the user columns.
+        db (AsyncSession): Async database session object.
+        version (int, optional): Expected version of the user, not checked if None.
+
+    Raises:
+        HTTPException: 400 if the user does not exist, 409 if the user is not at
+            the expected version.
+
+    Returns:
+        Row: The updated user.
+    """
+    if not values:
+        user = await get_user_by_id_async(user_id=user_id, db=db)
+        if version is not None and user.version != version:
+            raise _user_update_error(user_id, version, exists=True)
+        return user
+
+    result = await db.execute(_user_update_statement(user_id, values, version))
+    row = result.one_or_none()
+    if row is None:
+        user_id_found = await db.scalar(select(User.id).where(User.id == user_id))
+        raise _user_update_error(user_id, version, user_id_found is not None)
+
+    invalidate_after_commit(db.sync_session, user_cache, user_id)
+    invalidate_after_commit(db.sync_session, principal_cache, user_id)
+    return row
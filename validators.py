@@ -1,17 +1,14 @@
 from fastapi import HTTPException
-from authentications import get_password_hash
+from authentications import get_password_hash, get_password_hash_async
 
 
-def validate_password(password: str, confirm_password: str):
-    """Validate the password and confirm password.
+def check_password_confirmation(password: str, confirm_password: str):
+    """Check that the password and confirm password match.
 
     Args:
         password (str): Password to validate.
         confirm_password (str): Confirmation password to compare against.
 
-    Returns:
-        str: Hashed password if validation passes.
-
     Raises:
         HTTPException: If the password and confirm password do not match.
     """
@@ -21,6 +18,42 @@ def validate_password(password: str, confirm_password: str):
             status_code=400, detail="Password and Confirm password do not match"
         )
 
+
+def validate_password(password: str, confirm_password: str):
+    """Validate the password and confirm password.
+
+    Args:
+        password (str): Password to validate.
+        confirm_password (str): Confirmation password to compare against.
+
+    Returns:
+        str: Hashed password if validation passes.
+
+    Raises:
+        HTTPException: If the password and confirm password do not match.
+    """
+    check_password_confirmation(password=password, confirm_password=confirm_password)
+
     # Hash the password
     hashed_password = get_password_hash(password=password)
     return hashed_password
+
+
+async def validate_password_async(password: str, confirm_password: str):
+    """Validate the password and confirm password, hashing in the process pool.
+
+    Args:
+        password (str): Password to validate.
+        confirm_password (str): Confirmation password to compare against.
+
+    Returns:
+        str: Hashed password if validation passes.
+
+    Raises:
+        HTTPException: If the password and confirm password do not match.
+    """
+    check_password_confirmation(password=password, confirm_password=confirm_password)
+
+    # Hash the password without blocking the event loop
+    hashed_password = await get_password_hash_async(password=password)
+    return hashed_password